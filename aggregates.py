@@ -0,0 +1,245 @@
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from psychometrics import ItemStatistics
+from scoring import OPTIONS, encode_responses, score_matrix
+
+# Most points a time-series chart carries, however long the assessment has run.
+MAX_TIMELINE_POINTS = 120
+SCORE_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+
+class DashboardAggregates:
+    """Running dashboard totals, folded forward one batch of submissions at a time.
+
+    ``cursor`` is the id of the newest submission already counted. ``refresh``
+    only touches the store when a newer row exists, and derived tables are
+    memoised until the next batch arrives. ``filters`` restricts the totals
+    to matching submissions (see ``ResponseStore.load_since``).
+
+    Chart data is kept as fixed-size counts (one bin per possible score, one
+    entry per question, one per hour of submissions), so what the dashboard
+    sends to the browser does not grow with the number of candidates.
+    """
+
+    def __init__(self, assessment, filters=None):
+        key = assessment.key
+        self.assessment = assessment
+        self.filters = dict(filters or {})
+        self.key = key
+        self.cursor = 0
+        self.num_students = 0
+        self.score_sum = 0.0
+        self.passed = 0
+        self.highest = 0.0
+        self.question_correct = np.zeros(key.num_questions, dtype=np.int64)
+        self.question_answered = np.zeros(key.num_questions, dtype=np.int64)
+        self.topic_correct = np.zeros(len(key.topics), dtype=np.int64)
+        self.topic_total = np.zeros(len(key.topics), dtype=np.int64)
+        self.items = ItemStatistics(key)
+        # A score can exceed ``paper_size`` (an adaptive paper shortened after
+        # submissions were taken), but never the number of questions.
+        self.score_counts = np.zeros(max(key.paper_size, key.num_questions) + 1, dtype=np.int64)
+        self._hourly = {}
+        self._score_chunks = []
+        self._percentage_chunks = []
+        self._names = []
+        self._emails = []
+        self._phones = []
+        self._cohorts = []
+        self._attempts = []
+        self._memo = {}
+        self._lock = threading.RLock()
+
+    @property
+    def version(self):
+        return self.cursor
+
+    def refresh(self, store):
+        assessment_id = self.assessment.assessment_id
+        latest = store.latest_cursor(assessment_id)
+        if latest <= self.cursor:
+            return False
+        with self._lock:
+            rows, cursor = store.load_since(self.cursor, assessment_id, **self.filters)
+            if rows:
+                self.add(rows)
+            # Rows up to ``latest`` that didn't match the filters never need reading again.
+            self.cursor = max(cursor, latest)
+        return bool(rows)
+
+    def add(self, rows):
+        matrix = encode_responses([row.get('responses', {}) for row in rows], self.key)
+        result = score_matrix(matrix, self.key)
+        # Everything that can fail happens before any total is touched, so a
+        # failed batch leaves the aggregates as they were.
+        score_counts = np.bincount(result.scores, minlength=len(self.score_counts))
+        hours, groups = np.unique([row.get('timestamp', '')[:11] for row in rows], return_inverse=True)
+        counts = np.bincount(groups)
+        sums = np.bincount(groups, weights=result.percentages)
+        with self._lock:
+            self.items.add(matrix, result.scores)
+            self.num_students += result.num_students
+            self.score_sum += float(result.percentages.sum())
+            self.passed += int((result.scores >= self.assessment.pass_score).sum())
+            self.highest = max(self.highest, float(result.percentages.max()))
+            self.question_correct += result.question_correct
+            self.question_answered += result.question_answered
+            self.topic_correct += result.topic_correct
+            self.topic_total += result.topic_total
+            self.score_counts += score_counts
+            for hour, count, total in zip(hours.tolist(), counts.tolist(), sums.tolist()):
+                entry = self._hourly.setdefault(hour, [0, 0.0])
+                entry[0] += count
+                entry[1] += total
+            self._score_chunks.append(result.scores)
+            self._percentage_chunks.append(result.percentages)
+            self._names.extend(row.get('name', 'N/A') for row in rows)
+            self._emails.extend(row.get('email', 'N/A') for row in rows)
+            self._phones.extend(row.get('phone', 'N/A') for row in rows)
+            self._cohorts.extend(row.get('cohort', '') for row in rows)
+            self._attempts.extend(row.get('attempt_number', 1) for row in rows)
+            self._memo.clear()
+
+    def _memoised(self, name, build):
+        with self._lock:
+            if name not in self._memo:
+                self._memo[name] = build()
+            return self._memo[name]
+
+    def summary(self):
+        with self._lock:
+            return {
+                'students': self.num_students,
+                'average': self.score_sum / self.num_students if self.num_students else 0.0,
+                'passed': self.passed,
+                'highest': self.highest
+            }
+
+    def scores(self):
+        return self._memoised('scores', lambda: _concat(self._score_chunks, np.int64))
+
+    def percentages(self):
+        return self._memoised('percentages', lambda: _concat(self._percentage_chunks, np.float64))
+
+    def score_distribution(self):
+        """Candidates per score, indexed by score percentage, up to ``paper_size`` or the top score."""
+        def build():
+            scale = 100.0 / max(self.key.paper_size, 1)
+            scored = np.flatnonzero(self.score_counts)
+            bins = max(self.key.paper_size, int(scored[-1]) if len(scored) else 0) + 1
+            return pd.DataFrame({
+                'Score %': (np.arange(bins) * scale).round(1),
+                'Candidates': self.score_counts[:bins]
+            })
+        return self._memoised('score_distribution', build)
+
+    def score_quantiles(self):
+        """Score percentage at each of ``SCORE_QUANTILES``, read off the score counts."""
+        def build():
+            cumulative = np.cumsum(self.score_counts)
+            if not cumulative[-1]:
+                return {}
+            scale = 100.0 / max(self.key.paper_size, 1)
+            points = np.searchsorted(cumulative, np.array(SCORE_QUANTILES) * cumulative[-1])
+            return {q: float(point * scale) for q, point in zip(SCORE_QUANTILES, points)}
+        return self._memoised('score_quantiles', build)
+
+    def question_accuracy(self):
+        """Share answering each question correctly, out of those who answered it, in question order."""
+        def build():
+            with np.errstate(divide='ignore', invalid='ignore'):
+                accuracy = np.where(self.question_answered > 0,
+                                    self.question_correct * 100.0 / self.question_answered, np.nan)
+            return pd.DataFrame({
+                'Question': [f"Q{q_num}" for q_num in self.key.question_ids],
+                '% Correct': accuracy.round(1)
+            })
+        return self._memoised('question_accuracy', build)
+
+    def timeline(self, max_points=MAX_TIMELINE_POINTS):
+        """Submissions and average score per time window, at most ``max_points`` windows."""
+        def build():
+            hours = []
+            for key, (count, total) in self._hourly.items():
+                try:
+                    hours.append((datetime.strptime(key, "%Y%m%d_%H"), count, total))
+                except ValueError:
+                    continue
+            if not hours:
+                return pd.DataFrame(columns=['Submissions', 'Avg Score %'])
+            hours.sort()
+            first = hours[0][0]
+            span = int((hours[-1][0] - first).total_seconds() // 3600) + 1
+            width = -(-span // max_points)
+            windows = -(-span // width)
+            counts = np.zeros(windows, dtype=np.int64)
+            sums = np.zeros(windows)
+            for hour, count, total in hours:
+                window = int((hour - first).total_seconds() // 3600) // width
+                counts[window] += count
+                sums[window] += total
+            with np.errstate(divide='ignore', invalid='ignore'):
+                average = np.where(counts > 0, sums / counts, np.nan)
+            return pd.DataFrame(
+                {'Submissions': counts, 'Avg Score %': average.round(1)},
+                index=pd.date_range(first, periods=windows, freq=f"{width}h", name='Time')
+            )
+        return self._memoised(('timeline', max_points), build)
+
+    def topic_accuracy(self):
+        def build():
+            return {
+                topic: float(self.topic_correct[i] * 100.0 / self.topic_total[i])
+                for i, topic in enumerate(self.key.topics)
+                if self.topic_total[i] > 0
+            }
+        return self._memoised('topic_accuracy', build)
+
+    def students_frame(self):
+        def build():
+            scores = pd.Series(self.scores())
+            return pd.DataFrame({
+                'Name': self._names,
+                'Email': self._emails,
+                'Phone': self._phones,
+                'Cohort': self._cohorts,
+                'Attempt': self._attempts,
+                'Score': scores.astype(str) + f"/{self.key.paper_size}",
+                'Percentage': pd.Series(self.percentages()).round(1).astype(str) + "%",
+                'Status': np.where(scores >= self.assessment.pass_score, 'PASSED', 'FAILED')
+            })
+        return self._memoised('students_frame', build)
+
+    def reliability(self):
+        return self._memoised('reliability', self.items.reliability)
+
+    def item_analysis(self):
+        def build():
+            items = self.items
+            by_number = self.assessment.by_number
+            frequencies = items.option_frequencies() * 100.0
+            frame = pd.DataFrame({
+                'Question': [f"Q{q_num}" for q_num in self.key.question_ids],
+                'Topic': [by_number[q_num].topic for q_num in self.key.question_ids],
+                'Key': [OPTIONS[code - 1].upper() for code in self.key.correct],
+                'Difficulty (p)': items.difficulty().round(3),
+                'Discrimination (r)': items.point_biserial().round(3)
+            })
+            for code, option in enumerate(OPTIONS, start=1):
+                frame[f"{option.upper()} %"] = frequencies[:, code].round(1)
+            frame['Blank %'] = frequencies[:, 0].round(1)
+            frame['Review'] = items.flags()
+            return frame
+        return self._memoised('item_analysis', build)
+
+
+def _concat(chunks, dtype):
+    if not chunks:
+        return np.zeros(0, dtype=dtype)
+    if len(chunks) > 1:
+        chunks[:] = [np.concatenate(chunks)]
+    return chunks[0]
@@ -0,0 +1,55 @@
+from scoring import OPTIONS
+
+_LETTERS = (None,) + OPTIONS
+_CODES = {letter: code for code, letter in enumerate(OPTIONS, start=1)}
+
+
+class AnswerSheet:
+    """One candidate's answers as a single bytearray of option codes.
+
+    Byte ``i`` holds the canonical answer to question ``i`` of the
+    candidate's Paper: 0 for unanswered, 1..4 for options a..d, however the
+    options were ordered on screen. The header is just the paper, which is
+    shared by everyone on a fixed paper, so a session costs a few dozen
+    bytes plus one byte per question.
+    """
+
+    __slots__ = ('paper', 'codes')
+
+    def __init__(self, paper, codes=None):
+        self.paper = paper
+        self.codes = bytearray(codes) if codes is not None else bytearray(paper.size)
+
+    @property
+    def assessment_id(self):
+        return self.paper.assessment_id
+
+    @classmethod
+    def from_responses(cls, paper, responses):
+        sheet = cls(paper)
+        for q_num, answer in responses.items():
+            if int(q_num) in paper.column:
+                sheet.set(int(q_num), answer)
+        return sheet
+
+    def get(self, q_num):
+        return _LETTERS[self.codes[self.paper.column[q_num]]]
+
+    def set(self, q_num, answer):
+        self.codes[self.paper.column[q_num]] = _CODES.get(answer, 0)
+
+    def answered_count(self):
+        return len(self.codes) - self.codes.count(0)
+
+    def missing(self):
+        return [q_num for q_num, code in zip(self.paper.question_ids, self.codes) if not code]
+
+    def to_responses(self):
+        return {
+            str(q_num): _LETTERS[code]
+            for q_num, code in zip(self.paper.question_ids, self.codes)
+            if code
+        }
+
+    def __len__(self):
+        return len(self.codes)
@@ -0,0 +1,541 @@
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+import streamlit as st
+
+from aggregates import DashboardAggregates
+from assessment_app.services import (
+    LIVE_REFRESH_SECONDS,
+    ANALYSIS_WORKERS,
+    EXPORT_MAX_ROWS,
+    client_keys,
+    current_assessment,
+    get_authenticator,
+    get_autosaver,
+    get_deadline_sweeper,
+    get_event_bus,
+    get_question_bank,
+    get_response_store,
+    instructor_signed_in,
+    sign_out_instructor
+)
+from collusion import screen_assessment
+from export import EXPORT_FORMATS, export_responses
+from instrumentation import metrics, profiler
+from rescoring import answer_key_record, rescore_assessment
+from roster import RosterError, import_roster, read_roster
+
+@st.cache_resource(max_entries=16)
+def get_dashboard_aggregates(assessment_id, bank_signature, filters=()):
+    return DashboardAggregates(get_question_bank().get(assessment_id), dict(filters))
+
+def dashboard_aggregates(assessment, filters=None):
+    return get_dashboard_aggregates(
+        assessment.assessment_id, get_question_bank().signature, tuple(sorted((filters or {}).items()))
+    )
+
+@metrics.timed("load_dashboard_aggregates")
+def refresh_dashboard_aggregates(aggregates):
+    try:
+        aggregates.refresh(get_response_store())
+    except Exception as e:
+        st.error(f"Error loading responses: {str(e)}")
+    
+    return aggregates
+
+@st.cache_resource(max_entries=8)
+def get_collusion_report(assessment_id, bank_signature, cursor, filters=(), min_shared=3):
+    # Keyed on the newest submission id, so a report is reused until someone submits.
+    return screen_assessment(
+        get_response_store(), get_question_bank().get(assessment_id), dict(filters),
+        workers=ANALYSIS_WORKERS or os.cpu_count() or 1, min_shared=min_shared
+    )
+
+@metrics.timed("page.instructor_login")
+def instructor_login_page():
+    st.markdown("""
+        <div class="instructor-header">
+            <h1>Instructor Portal</h1>
+            <p>Access Student Analytics</p>
+        </div>
+    """, unsafe_allow_html=True)
+    
+    st.write("---")
+    
+    col1, col2 = st.columns([1, 2])
+    
+    with col1:
+        st.subheader("Login")
+        
+        authenticator = get_authenticator()
+        password = st.text_input("Password:", type="password", placeholder="Enter password")
+        
+        col_login, col_back = st.columns(2)
+        
+        with col_login:
+            if st.button("Login", use_container_width=True, disabled=not authenticator.configured):
+                token, error = authenticator.login(password, client_keys())
+                if token:
+                    st.session_state.instructor_token = token
+                    st.session_state.page = 'dashboard'
+                    st.rerun()
+                else:
+                    st.error(error)
+        
+        with col_back:
+            if st.button("Back", use_container_width=True):
+                st.session_state.page = 'home'
+                st.rerun()
+    
+    with col2:
+        if authenticator.configured:
+            st.info("Use the instructor password provided by your administrator.")
+        else:
+            st.warning("""
+            Instructor login is disabled until a password is configured.
+            
+            Run `python auth.py` to generate a hash and set it as
+            `INSTRUCTOR_PASSWORD_HASH` on the server.
+            """)
+
+@metrics.timed("page.dashboard")
+def dashboard_page():
+    if not instructor_signed_in():
+        st.error("Not authenticated. Please login first.")
+        st.stop()
+    
+    st.markdown("""
+        <div class="instructor-header">
+            <h1>Instructor Dashboard</h1>
+            <p>Student Performance Analytics</p>
+        </div>
+    """, unsafe_allow_html=True)
+    
+    bank = get_question_bank()
+    assessment = current_assessment()
+    if len(bank.assessments) > 1:
+        assessment_ids = list(bank.assessments.keys())
+        st.session_state.assessment_id = st.selectbox(
+            "Assessment",
+            assessment_ids,
+            index=assessment_ids.index(assessment.assessment_id),
+            format_func=lambda a: bank.assessments[a].title
+        )
+        assessment = current_assessment()
+    
+    live = st.toggle(
+        "Live monitoring",
+        key='live_monitoring',
+        help=f"Refresh progress, summary and charts every {LIVE_REFRESH_SECONDS:g}s without reloading the page"
+    )
+    filters = dashboard_filters(assessment)
+    
+    # One refresh per rerun: the live fragment refreshes on each of its own runs, including this one.
+    aggregates = dashboard_aggregates(assessment, filters)
+    if live:
+        live_dashboard(assessment, aggregates, filters)
+    else:
+        refresh_dashboard_aggregates(aggregates)
+        dashboard_summary(assessment, aggregates, filters)
+    
+    if not aggregates.num_students:
+        if st.button("Back to Home"):
+            sign_out_instructor()
+            st.rerun()
+        return
+    
+    st.subheader("Students")
+    st.dataframe(aggregates.students_frame(), use_container_width=True, hide_index=True)
+    
+    if st.button("🔍 Collusion Screening"):
+        st.session_state.page = 'collusion'
+        st.rerun()
+    
+    st.write("---")
+    
+    st.subheader("Export")
+    export_format = st.selectbox("Format", list(EXPORT_FORMATS.keys()))
+    extension, mime = EXPORT_FORMATS[export_format]
+    store = get_response_store()
+    if aggregates.num_students > EXPORT_MAX_ROWS:
+        st.warning(
+            f"This export has {aggregates.num_students} rows, more than the {EXPORT_MAX_ROWS} the dashboard serves. "
+            f"Narrow the filters, or run `python export.py {assessment.assessment_id} "
+            f"students.{extension} --format {export_format}` on the server."
+        )
+    else:
+        st.download_button(
+            f"Download {export_format}",
+            data=lambda: export_responses(store, assessment, export_format, filters=filters),
+            file_name=f"students_{datetime.now().strftime('%Y%m%d')}.{extension}",
+            mime=mime,
+            use_container_width=True
+        )
+    
+    st.write("---")
+    
+    roster_panel(assessment)
+    rescore_panel(assessment)
+    diagnostics_panel()
+    
+    if st.button("Back to Home"):
+        sign_out_instructor()
+        st.rerun()
+
+@metrics.timed("page.collusion")
+def collusion_page():
+    if not instructor_signed_in():
+        st.error("Not authenticated. Please login first.")
+        st.stop()
+    
+    assessment = current_assessment()
+    st.markdown(f"""
+        <div class="instructor-header">
+            <h1>Collusion Screening</h1>
+            <p>{assessment.title}</p>
+        </div>
+    """, unsafe_allow_html=True)
+    
+    filters = dashboard_filters(assessment)
+    min_shared = st.slider(
+        "Minimum shared wrong answers", 2, max(assessment.paper_size, 2), min(3, assessment.paper_size),
+        help="Pairs with fewer identical wrong answers than this are not reported"
+    )
+    
+    try:
+        with st.spinner("Comparing answer patterns..."):
+            report = get_collusion_report(
+                assessment.assessment_id, get_question_bank().signature,
+                get_response_store().latest_cursor(assessment.assessment_id),
+                tuple(sorted(filters.items())), min_shared
+            )
+    except Exception as e:
+        st.error(f"Error screening responses: {str(e)}")
+        report = None
+    
+    if report is not None:
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Submissions", report['candidates'])
+        with col2:
+            st.metric("Screened", report['eligible'])
+        with col3:
+            st.metric("Pairs Compared", report['compared'])
+        with col4:
+            st.metric("Pairs Flagged", report['flagged'])
+        
+        method = "every pair" if report['method'] == 'exact' else "pairs sharing a MinHash bucket"
+        st.caption(
+            f"Candidates with at least {min_shared} wrong answers were compared ({method}). "
+            "Pairs are ranked by the chance of sharing that many identical wrong answers "
+            "independently; a low chance is a reason to review, not proof of copying."
+        )
+        if report['skipped_buckets']:
+            st.caption(
+                f"{report['skipped_buckets']} very common wrong-answer patterns were not expanded into pairs."
+            )
+        
+        if report['pairs']:
+            pairs = pd.DataFrame(report['pairs'])
+            st.dataframe(
+                pairs, use_container_width=True, hide_index=True,
+                column_config={'Chance p': st.column_config.NumberColumn(format="%.2e")}
+            )
+            st.download_button(
+                "Download flagged pairs",
+                data=pairs.to_csv(index=False),
+                file_name=f"collusion_{assessment.assessment_id}_{datetime.now().strftime('%Y%m%d')}.csv",
+                mime="text/csv"
+            )
+        else:
+            st.success("No pairs share that many wrong answers.")
+    
+    if st.button("Back to Dashboard"):
+        st.session_state.page = 'dashboard'
+        st.rerun()
+
+def dashboard_filters(assessment):
+    options = get_response_store().filter_options(assessment.assessment_id)
+    if not options['first']:
+        return {}
+    
+    filters = {}
+    col_cohort, col_dates, col_attempt = st.columns(3)
+    with col_cohort:
+        cohort = st.selectbox(
+            "Cohort",
+            [None] + options['cohorts'],
+            format_func=lambda c: "All cohorts" if c is None else (c or "(no cohort)")
+        )
+        if cohort is not None:
+            filters['cohort'] = cohort
+    with col_dates:
+        try:
+            first = datetime.strptime(options['first'][:8], "%Y%m%d").date()
+            last = datetime.strptime(options['last'][:8], "%Y%m%d").date()
+        except ValueError:
+            first = last = None
+        if first is not None:
+            dates = st.date_input("Submitted between", (first, last))
+            if len(dates) == 2 and dates != (first, last):
+                filters['since'] = dates[0].strftime("%Y%m%d")
+                filters['until'] = (dates[1] + timedelta(days=1)).strftime("%Y%m%d")
+    with col_attempt:
+        attempt = st.selectbox(
+            "Attempt",
+            [None] + list(range(1, options['max_attempt'] + 1)),
+            format_func=lambda a: "All attempts" if a is None else f"Attempt {a}"
+        )
+        if attempt is not None:
+            filters['attempt_number'] = attempt
+    return filters
+
+def dashboard_summary(assessment, aggregates, filters=None):
+    
+    if not aggregates.num_students:
+        st.warning("No student data yet." if not filters else "No submissions match these filters.")
+        return
+    
+    summary = aggregates.summary()
+    
+    st.subheader("Summary")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Students", summary['students'])
+    with col2:
+        st.metric("Avg Score", f"{summary['average']:.1f}%")
+    with col3:
+        st.metric("Passed", f"{summary['passed']}/{summary['students']}")
+    with col4:
+        st.metric("Highest", f"{summary['highest']:.1f}%")
+    
+    store_stats = get_response_store().stats()
+    autosave_stats = get_autosaver().stats()
+    sweeper_stats = get_deadline_sweeper().stats()
+    st.caption(
+        f"Duplicate submission writes suppressed on this server: {store_stats['duplicates_suppressed']} · "
+        f"Autosave: {autosave_stats['staged']} saves coalesced into "
+        f"{autosave_stats['rows_written']} rows over {autosave_stats['flushes']} batched writes · "
+        f"Timed-out attempts auto-submitted: {sweeper_stats['submitted']}"
+        + (f" ({sweeper_stats['given_up']} set aside after repeated failures)" if sweeper_stats['given_up'] else "")
+    )
+    
+    st.write("---")
+    
+    with metrics.span("dashboard.charts"):
+        # Every chart below is built from fixed-size aggregates, so its payload does not grow with candidates.
+        st.subheader("Score Distribution")
+        st.bar_chart(aggregates.score_distribution(), x='Score %', y='Candidates', height=250)
+        quantiles = aggregates.score_quantiles()
+        if quantiles:
+            st.caption("Score percentiles: " + " · ".join(
+                f"P{q * 100:.0f} {value:.1f}%" for q, value in quantiles.items()
+            ))
+        
+        col_questions, col_timeline = st.columns(2)
+        with col_questions:
+            st.subheader("Question Accuracy")
+            st.bar_chart(aggregates.question_accuracy(), x='Question', y='% Correct', sort=False, height=250)
+        with col_timeline:
+            st.subheader("Submissions Over Time")
+            timeline = aggregates.timeline()
+            if len(timeline):
+                st.bar_chart(timeline, y='Submissions', height=250)
+                st.line_chart(timeline, y='Avg Score %', height=150)
+        
+        st.write("---")
+        
+        col_topics, col_items = st.columns(2)
+        with col_topics:
+            st.subheader("Topic Performance")
+            topic_list = [
+                {'Topic': topic, 'Percentage': pct}
+                for topic, pct in aggregates.topic_accuracy().items()
+            ]
+            
+            if topic_list:
+                topic_df = pd.DataFrame(topic_list)
+                st.bar_chart(topic_df.set_index('Topic'))
+        
+        with col_items:
+            st.subheader("Item Analysis")
+            reliability = aggregates.reliability()
+            col_kr20, col_sem = st.columns(2)
+            with col_kr20:
+                st.metric("KR-20 (α)", "n/a" if reliability['kr20'] is None else f"{reliability['kr20']:.2f}")
+            with col_sem:
+                st.metric("SEM", "n/a" if reliability['sem'] is None else f"{reliability['sem']:.2f} pts")
+            st.scatter_chart(
+                aggregates.item_analysis(),
+                x='Difficulty (p)',
+                y='Discrimination (r)',
+                height=250
+            )
+    
+    st.caption(
+        "Difficulty is the share answering correctly; discrimination is the item-rest "
+        "point-biserial correlation. Option columns show how often each choice was picked."
+    )
+    st.dataframe(aggregates.item_analysis(), use_container_width=True, hide_index=True)
+    
+    st.write("---")
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+@metrics.timed("fragment.live_dashboard")
+def live_dashboard(assessment, aggregates, filters=None):
+    bus = get_event_bus()
+    refresh_dashboard_aggregates(aggregates)
+    attempts = get_response_store().attempt_counts(assessment.assessment_id)
+    # Submissions since the last refresh, counted in the store for this assessment on every worker.
+    submitted = attempts.get('submitted', 0)
+    seen = st.session_state.setdefault('live_submitted', {})
+    arrived = submitted - seen.get(assessment.assessment_id, submitted)
+    seen[assessment.assessment_id] = submitted
+    
+    st.subheader("Live Progress")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("In Progress", attempts.get('in_progress', 0))
+    with col2:
+        st.metric("Submitted", submitted, delta=arrived or None)
+    with col3:
+        st.metric("Abandoned", attempts.get('abandoned', 0))
+    
+    recent = [
+        e for e in bus.recent('submitted', limit=50)
+        if e['assessment_id'] == assessment.assessment_id
+    ][:5]
+    if recent:
+        st.caption("Latest submissions on this server: " + " · ".join(
+            f"{datetime.fromtimestamp(e['at']).strftime('%H:%M:%S')} {e['name']}" for e in recent
+        ))
+    
+    st.write("---")
+    
+    dashboard_summary(assessment, aggregates, filters)
+
+def roster_panel(assessment):
+    with st.expander("Candidate roster"):
+        store = get_response_store()
+        size = store.roster_size(assessment.assessment_id)
+        st.caption(
+            (f"{size} candidates registered; only they can start this assessment, "
+             "with the phone number on the roster." if size else
+             "No roster yet: anyone with a valid name, email and phone can start this assessment.")
+            + " Upload a CSV or Excel file with name, email and phone columns "
+            "(optionally cohort and max_attempts)."
+        )
+        uploaded = st.file_uploader("Roster file", type=["csv", "xlsx"])
+        col_attempts, col_replace = st.columns(2)
+        with col_attempts:
+            max_attempts = st.number_input(
+                "Attempts allowed (0 = unlimited)", min_value=0, value=0, step=1,
+                help="Used for rows without a max_attempts value."
+            )
+        with col_replace:
+            replace = st.checkbox("Replace the existing roster")
+        if uploaded is not None and st.button("Import roster"):
+            try:
+                with st.spinner("Importing roster..."):
+                    frame = read_roster(uploaded, uploaded.name)
+                    st.session_state.roster_summary = import_roster(
+                        store, assessment.assessment_id, frame, int(max_attempts), replace
+                    )
+            except RosterError as e:
+                st.error(str(e))
+            except Exception as e:
+                st.error(f"Error importing roster: {str(e)}")
+        
+        summary = st.session_state.get('roster_summary')
+        if summary is not None and summary['assessment_id'] == assessment.assessment_id:
+            rejected = summary['rejected']
+            st.success(
+                f"Imported {summary['imported']} of {summary['rows']} rows "
+                f"({summary['duplicates']} duplicate emails merged, {len(rejected)} rejected); "
+                f"the roster now has {summary['roster_size']} candidates."
+            )
+            if len(rejected):
+                st.dataframe(rejected.head(100), use_container_width=True, hide_index=True)
+                st.download_button(
+                    "Download rejected rows",
+                    data=rejected.to_csv(index=False),
+                    file_name=f"roster_rejected_{assessment.assessment_id}.csv",
+                    mime="text/csv"
+                )
+
+def rescore_panel(assessment):
+    with st.expander("Re-score after an answer key change"):
+        store = get_response_store()
+        st.caption(
+            "Re-scoring stores every submission's score under the current key version "
+            "and lists candidates whose status changed since the previous key."
+        )
+        if st.button("Re-score all submissions"):
+            try:
+                with st.spinner("Re-scoring submissions..."):
+                    st.session_state.rescore_summary = rescore_assessment(
+                        store, assessment, ANALYSIS_WORKERS or None
+                    )
+            except Exception as e:
+                st.error(f"Error re-scoring submissions: {str(e)}")
+        
+        summary = st.session_state.get('rescore_summary')
+        if summary is not None and summary['assessment_id'] == assessment.assessment_id:
+            st.success(
+                f"Re-scored {summary['submissions']} submissions with key {summary['version']} "
+                f"(compared with {summary['against'] or 'no earlier key'}): "
+                f"{summary['scores_changed']} scores changed, "
+                f"{summary['now_passed']} now pass, {summary['now_failed']} now fail."
+            )
+            if summary['changes']:
+                changes = pd.DataFrame(summary['changes'])
+                st.dataframe(changes, use_container_width=True, hide_index=True)
+                st.download_button(
+                    "Download status changes",
+                    data=changes.to_csv(index=False),
+                    file_name=f"status_changes_{summary['version']}.csv",
+                    mime="text/csv"
+                )
+        
+        version, _ = answer_key_record(assessment)
+        keys = store.answer_keys(assessment.assessment_id)
+        if keys:
+            st.dataframe(pd.DataFrame([
+                {
+                    'Key version': entry['version'] + (" (current)" if entry['version'] == version else ""),
+                    'First seen': entry['recorded_at'][:16].replace('T', ' '),
+                    'Scores published': (entry['published_at'] or "")[:16].replace('T', ' ')
+                }
+                for entry in keys
+            ]), use_container_width=True, hide_index=True)
+
+def diagnostics_panel():
+    with st.expander("Diagnostics"):
+        snapshot = metrics.snapshot()
+        if snapshot:
+            st.dataframe(pd.DataFrame([
+                {
+                    'Span': name,
+                    'Count': stats['count'],
+                    'Mean (ms)': stats['mean'] * 1000,
+                    'p50 (ms)': stats['p50'] * 1000,
+                    'p95 (ms)': stats['p95'] * 1000,
+                    'p99 (ms)': stats['p99'] * 1000,
+                    'Max (ms)': stats['max'] * 1000
+                }
+                for name, stats in snapshot.items()
+            ]), use_container_width=True, hide_index=True)
+            st.caption("Timings cover this server process since it started; percentiles are estimated from histogram buckets.")
+        st.download_button(
+            "Download Prometheus metrics",
+            data=metrics.prometheus_text,
+            file_name="metrics.prom",
+            mime="text/plain"
+        )
+        
+        if not profiler.enabled:
+            st.caption("Set PROFILE_SLOW_RERUNS=N to keep cProfile output for the N slowest reruns.")
+        for record in profiler.slowest():
+            st.markdown(f"**{record['label']}** · {record['seconds'] * 1000:.1f} ms · {record['captured_at']}")
+            st.code(record['stats'], language=None)
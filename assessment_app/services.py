@@ -0,0 +1,387 @@
+import logging
+import os
+import re
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+import streamlit as st
+
+from answer_sheet import AnswerSheet
+from auth import Authenticator, configured_password_hash
+from autosave import AttemptAutosaver
+from compaction import Compactor
+from deadlines import DeadlineSweeper, attempt_deadline, deadline_timestamp
+from events import EventBus
+from instrumentation import metrics
+from irt import ItemTable, calibration_key
+from papers import adaptive_paper, generate_paper, next_adaptive_paper
+from question_bank import QUESTION_BANK_DIR, QuestionBankError, bank_signature, load_question_bank
+from rescoring import answer_key_record
+from response_store import AttemptLimitError, open_store, submission_key
+from roster import EMAIL_PATTERN, MIN_NAME_LENGTH, PHONE_PATTERN, RosterIndex, check_candidate
+
+logger = logging.getLogger(__name__)
+
+# Questions shown per assessment page, or "topic" for one page per topic.
+QUESTIONS_PER_SECTION = os.environ.get("QUESTIONS_PER_SECTION", "5")
+AUTOSAVE_INTERVAL_SECONDS = float(os.environ.get("AUTOSAVE_INTERVAL_SECONDS", "5"))
+# Prometheus text file rewritten with span histograms, e.g. for node_exporter.
+METRICS_FILE = os.environ.get("METRICS_FILE")
+LIVE_REFRESH_SECONDS = float(os.environ.get("LIVE_REFRESH_SECONDS", "3"))
+# Cohort recorded on submissions when the link has no ?cohort=... parameter.
+DEFAULT_COHORT = os.environ.get("ASSESSMENT_COHORT", "")
+# How often a rerun re-stats the question bank directory for edits.
+BANK_CHECK_SECONDS = float(os.environ.get("BANK_CHECK_SECONDS", "2"))
+# Answers arriving this long after the deadline still count, to allow for network lag.
+DEADLINE_GRACE_SECONDS = float(os.environ.get("DEADLINE_GRACE_SECONDS", "30"))
+DEADLINE_SWEEP_SECONDS = float(os.environ.get("DEADLINE_SWEEP_SECONDS", "30"))
+# Processes used by re-scoring and collusion screening from the dashboard; 0 means one per CPU.
+ANALYSIS_WORKERS = int(os.environ.get("ANALYSIS_WORKERS", "0"))
+# Background compaction of legacy response files and old attempt rows; 0 turns it off.
+COMPACTION_INTERVAL_SECONDS = float(os.environ.get("COMPACTION_INTERVAL_SECONDS", "3600"))
+ATTEMPT_RETENTION_DAYS = int(os.environ.get("ATTEMPT_RETENTION_DAYS", "30"))
+# Streamlit holds a download in memory while serving it; larger exports go through `python export.py`.
+EXPORT_MAX_ROWS = int(os.environ.get("EXPORT_MAX_ROWS", "50000"))
+
+@st.cache_resource(max_entries=2)
+def _load_question_bank(signature):
+    bank = load_question_bank(QUESTION_BANK_DIR)
+    # Keep every key version the app has served, so a later re-score can report what changed.
+    try:
+        store = get_response_store()
+        for assessment in bank.assessments.values():
+            store.record_answer_key(assessment.assessment_id, *answer_key_record(assessment))
+    except Exception:
+        logger.exception("Could not record answer key versions")
+    return bank
+
+@st.cache_resource
+def _question_bank_holder():
+    return {}
+
+@metrics.timed("question_bank")
+def get_question_bank():
+    holder = _question_bank_holder()
+    now = time.monotonic()
+    if 'bank' in holder and now - holder['checked_at'] < BANK_CHECK_SECONDS:
+        return holder['bank']
+    holder['checked_at'] = now
+    try:
+        holder['bank'] = _load_question_bank(bank_signature(QUESTION_BANK_DIR))
+    except QuestionBankError as e:
+        if 'bank' not in holder:
+            raise
+        logger.warning("Question bank reload failed, serving previous version: %s", e)
+    return holder['bank']
+
+def init_session_state():
+    defaults = {
+        'page': 'home',
+        'answers': None,
+        'section': 0,
+        'student_name': "",
+        'student_email': "",
+        'student_phone': "",
+        'attempt_id': "",
+        'deadline': None,
+        'assessment_id': get_question_bank().default_id,
+        'cohort': link_cohort(),
+        'instructor_token': None,
+        'client_id': uuid.uuid4().hex
+    }
+    
+    for key, value in defaults.items():
+        if key not in st.session_state:
+            st.session_state[key] = value
+
+def link_cohort():
+    """The cohort from the page's ``?cohort=`` link, else ``ASSESSMENT_COHORT``."""
+    return st.query_params.get('cohort', DEFAULT_COHORT)
+
+def validate_email(email):
+    return re.match(EMAIL_PATTERN, email) is not None
+
+def validate_phone(phone):
+    return re.match(PHONE_PATTERN, phone) is not None
+
+def validate_name(name):
+    return len(name.strip()) >= MIN_NAME_LENGTH
+
+@st.cache_resource
+def get_event_bus():
+    return EventBus()
+
+@st.cache_resource
+def get_response_store():
+    store = open_store()
+    store.import_json_files("responses")
+    store.add_listener(lambda submission: get_event_bus().publish('submitted', **submission))
+    return store
+
+@st.cache_resource
+def get_authenticator():
+    return Authenticator(configured_password_hash())
+
+def client_keys():
+    # Throttle failed logins per browser session and, when known, per client IP.
+    keys = [f"session:{st.session_state.client_id}"]
+    ip_address = st.context.ip_address
+    if ip_address:
+        keys.append(f"ip:{ip_address}")
+    return keys
+
+def instructor_signed_in():
+    return get_authenticator().session_valid(st.session_state.instructor_token)
+
+def sign_out_instructor():
+    get_authenticator().logout(st.session_state.instructor_token)
+    st.session_state.instructor_token = None
+    st.session_state.page = 'home'
+
+@st.cache_resource
+def get_autosaver():
+    return AttemptAutosaver(get_response_store(), AUTOSAVE_INTERVAL_SECONDS)
+
+@st.cache_resource(ttl=300, max_entries=16)
+def _load_item_table(assessment_id, key_hash):
+    parameters = get_response_store().item_parameters(assessment_id, key_hash)
+    return ItemTable.from_parameters(parameters) if parameters and parameters['a'] else None
+
+def item_table(assessment):
+    """The assessment's IRT lookup table, or None until ``python irt.py`` has calibrated its current key."""
+    try:
+        return _load_item_table(assessment.assessment_id, calibration_key(assessment))
+    except Exception:
+        logger.exception("Could not load item parameters for %s", assessment.assessment_id)
+        return None
+
+@st.cache_resource(max_entries=16)
+def _load_roster_index(assessment_id, version):
+    return RosterIndex(get_response_store().load_roster(assessment_id))
+
+def roster_index(assessment_id):
+    """The assessment's in-memory roster, or None if it has none; reloaded after each import."""
+    version = get_response_store().roster_version(assessment_id)
+    if version is None:
+        return None
+    index = _load_roster_index(assessment_id, version)
+    return index if len(index) else None
+
+def check_registration(assessment, email, phone):
+    """Roster check for a login, as ``(error, registration)``.
+
+    Both are None when the assessment has no roster; otherwise
+    ``registration`` is the candidate's ``(email, phone, max_attempts, cohort)``.
+    """
+    index = roster_index(assessment.assessment_id)
+    if index is None:
+        return None, None
+    store = get_response_store()
+    error = check_candidate(
+        index, email, phone, lambda registered: store.count_submissions(registered, assessment.assessment_id)
+    )
+    return error, None if error else index.get(email)
+
+def attempt_limit(assessment_id, email):
+    """Submissions the roster allows ``email`` for the assessment; 0 for no limit."""
+    index = roster_index(assessment_id)
+    entry = index.get(email) if index is not None else None
+    return entry[2] if entry is not None else 0
+
+def attempt_paper(assessment, email, attempt_id, codes=b""):
+    table = item_table(assessment) if assessment.adaptive else None
+    if table is None:
+        return generate_paper(assessment, email, attempt_id)
+    return adaptive_paper(assessment, table, email, attempt_id, codes)[0]
+
+def attempt_sheet(assessment, email, attempt_id, answers):
+    """Rebuild a stored attempt's answer sheet; None if the answers no longer fit its paper."""
+    paper = attempt_paper(assessment, email, attempt_id, answers)
+    if paper.adaptive:
+        answers = bytes(answers).ljust(paper.size, b"\0")
+    return AnswerSheet(paper, answers) if len(answers) == paper.size else None
+
+def submit_expired_attempt(attempt):
+    assessment = get_question_bank().get(attempt['assessment_id'])
+    answers = get_autosaver().pending_answers(attempt['attempt_id']) or attempt['answers']
+    sheet = attempt_sheet(assessment, attempt['email'], attempt['attempt_id'], answers)
+    if sheet is None:
+        logger.warning("Expired attempt %s no longer matches its paper; closing it unsubmitted",
+                       attempt['attempt_id'])
+        get_response_store().set_attempt_status(attempt['attempt_id'], 'expired')
+        return
+    try:
+        get_response_store().save(
+            attempt['email'], sheet.to_responses(), attempt['name'], attempt['phone'],
+            submission_id=submission_key(attempt['email'], attempt['attempt_id']),
+            assessment_id=attempt['assessment_id'],
+            attempt_id=attempt['attempt_id'],
+            cohort=attempt['cohort'],
+            max_attempts=attempt_limit(attempt['assessment_id'], attempt['email'])
+        )
+    except AttemptLimitError as e:
+        logger.warning("Expired attempt %s not submitted: %s", attempt['attempt_id'], e)
+    get_autosaver().discard(attempt['attempt_id'])
+
+@st.cache_resource
+def get_deadline_sweeper():
+    return DeadlineSweeper(get_response_store(), submit_expired_attempt,
+                           DEADLINE_SWEEP_SECONDS, DEADLINE_GRACE_SECONDS)
+
+@st.cache_resource
+def get_compactor():
+    if COMPACTION_INTERVAL_SECONDS <= 0:
+        return None
+    return Compactor(get_response_store(), "responses", COMPACTION_INTERVAL_SECONDS, ATTEMPT_RETENTION_DAYS)
+
+def current_assessment():
+    return get_question_bank().get(st.session_state.assessment_id)
+
+def candidate_paper(assessment, codes=b""):
+    return attempt_paper(assessment, st.session_state.student_email, st.session_state.attempt_id, codes)
+
+def answer_sheet():
+    assessment = current_assessment()
+    sheet = st.session_state.answers
+    if sheet is None or sheet.assessment_id != assessment.assessment_id:
+        sheet = AnswerSheet(candidate_paper(assessment))
+    elif sheet.paper.key is not assessment.key:
+        codes = sheet.codes if sheet.paper.adaptive else b""
+        sheet = AnswerSheet.from_responses(candidate_paper(assessment, codes), sheet.to_responses())
+    st.session_state.answers = sheet
+    return sheet
+
+def advance_adaptive(assessment):
+    """Add the next adaptive question to the candidate's paper; True once the paper is complete."""
+    sheet = answer_sheet()
+    table = item_table(assessment)
+    if table is None:
+        return True
+    paper, finished = next_adaptive_paper(assessment, table, sheet.paper, sheet.codes)
+    if not finished:
+        st.session_state.answers = AnswerSheet(paper, bytes(sheet.codes) + b"\0")
+    return finished
+
+def estimate_ability(sheet):
+    """``(theta, standard error)`` from the answered questions, or None when uncalibrated."""
+    table = item_table(current_assessment())
+    if table is None:
+        return None
+    answered = [(q_num, code == correct)
+                for q_num, code, correct in zip(sheet.paper.question_ids, sheet.codes, sheet.paper.correct)
+                if code]
+    return table.estimate([q_num for q_num, _ in answered], [right for _, right in answered])
+
+def begin_attempt(assessment):
+    started = datetime.now()
+    deadline = attempt_deadline(started, assessment.time_limit_minutes)
+    st.session_state.deadline = deadline_timestamp(deadline)
+    try:
+        get_response_store().start_attempt(
+            st.session_state.attempt_id,
+            st.session_state.student_email,
+            assessment.assessment_id,
+            st.session_state.student_name,
+            st.session_state.student_phone,
+            answer_sheet().codes,
+            deadline,
+            st.session_state.cohort
+        )
+    except Exception as e:
+        st.error(f"Error starting attempt: {str(e)}")
+
+def seconds_left():
+    deadline = st.session_state.deadline
+    return None if deadline is None else deadline - time.time()
+
+def attempt_expired(grace=0.0):
+    left = seconds_left()
+    return left is not None and left < -grace
+
+def save_attempt_progress():
+    sheet = answer_sheet()
+    try:
+        get_autosaver().stage(
+            st.session_state.attempt_id,
+            st.session_state.student_email,
+            sheet.assessment_id,
+            st.session_state.student_name,
+            st.session_state.student_phone,
+            sheet.codes
+        )
+    except Exception as e:
+        st.error(f"Error saving progress: {str(e)}")
+
+def resume_attempt(attempt):
+    """Load a stored attempt into the session; returns why it can't be resumed, or None.
+
+    An in-progress attempt reopens on the assessment page and a submitted one
+    on its results. Abandoned, expired, failed and over-limit attempts are closed.
+    """
+    if attempt['status'] not in ('in_progress', 'submitted'):
+        return "This attempt is closed and can no longer be resumed. Please start a new attempt."
+    assessment = get_question_bank().get(attempt['assessment_id'])
+    answers = get_autosaver().pending_answers(attempt['attempt_id']) or attempt['answers']
+    sheet = attempt_sheet(assessment, attempt['email'], attempt['attempt_id'], answers)
+    if sheet is None:
+        return "This attempt no longer matches the assessment paper and cannot be resumed."
+    st.session_state.assessment_id = assessment.assessment_id
+    st.session_state.attempt_id = attempt['attempt_id']
+    st.session_state.student_name = attempt['name']
+    st.session_state.student_email = attempt['email']
+    st.session_state.student_phone = attempt['phone']
+    st.session_state.cohort = attempt['cohort'] or link_cohort()
+    st.session_state.deadline = deadline_timestamp(attempt['deadline'])
+    st.session_state.answers = sheet
+    st.session_state.section = 0
+    st.session_state.page = 'results' if attempt['status'] == 'submitted' else 'assessment'
+    st.query_params['attempt'] = attempt['attempt_id']
+    return None
+
+def restore_attempt():
+    # The attempt id travels in the URL, so a candidate whose websocket
+    # reconnects to a different worker picks up where they left off.
+    attempt_id = st.query_params.get('attempt')
+    if not attempt_id or attempt_id == st.session_state.attempt_id:
+        return
+    attempt = get_response_store().load_attempt(attempt_id)
+    error = "This attempt could not be found." if attempt is None else resume_attempt(attempt)
+    if error:
+        del st.query_params['attempt']
+        st.error(error)
+
+@metrics.timed("save_response")
+def save_response(email, responses, student_name, student_phone, attempt_id, assessment_id, cohort=""):
+    try:
+        # Land any buffered progress first so the submit below closes the attempt row.
+        get_autosaver().flush()
+        submission_id = get_response_store().save(
+            email, responses, student_name, student_phone,
+            submission_id=submission_key(email, attempt_id),
+            assessment_id=assessment_id,
+            attempt_id=attempt_id,
+            cohort=cohort,
+            max_attempts=attempt_limit(assessment_id, email)
+        )
+        get_autosaver().discard(attempt_id)
+        return submission_id
+    except AttemptLimitError:
+        get_autosaver().discard(attempt_id)
+        st.error("This attempt was not recorded: you have already used all the attempts allowed for this assessment.")
+        return None
+    except Exception as e:
+        st.error(f"Error saving response: {str(e)}")
+        return None
+
+@metrics.timed("calculate_score")
+def calculate_score(sheet):
+    try:
+        paper = sheet.paper
+        score = int(np.count_nonzero(np.frombuffer(bytes(sheet.codes), dtype=np.uint8) == paper.correct))
+        correct_answers = {q.number: q.correct for q in paper.questions}
+        return score, correct_answers
+    except Exception as e:
+        st.error(f"Error calculating score: {str(e)}")
+        return 0, {}
@@ -0,0 +1,476 @@
+import uuid
+
+import streamlit as st
+
+from assessment_app import theme
+from assessment_app.services import (
+    DEADLINE_GRACE_SECONDS,
+    QUESTIONS_PER_SECTION,
+    advance_adaptive,
+    answer_sheet,
+    attempt_expired,
+    begin_attempt,
+    calculate_score,
+    check_registration,
+    current_assessment,
+    estimate_ability,
+    get_autosaver,
+    get_event_bus,
+    get_question_bank,
+    get_response_store,
+    link_cohort,
+    resume_attempt,
+    save_attempt_progress,
+    save_response,
+    seconds_left,
+    validate_email,
+    validate_name,
+    validate_phone
+)
+from instrumentation import metrics
+from question_bank import paginate_questions
+
+@metrics.timed("page.home")
+def home_page():
+    bank = get_question_bank()
+    assessment = current_assessment()
+    st.markdown(f"""
+        <div class="header-container">
+            <h1>📋 {assessment.title}</h1>
+            <p style='font-size: 18px; margin: 10px 0;'>{assessment.description}</p>
+        </div>
+    """, unsafe_allow_html=True)
+    
+    st.write("---")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("👤 Student Mode")
+        st.info("📝 Take the assessment and view your score")
+        if len(bank.assessments) > 1:
+            assessment_ids = list(bank.assessments.keys())
+            st.session_state.assessment_id = st.selectbox(
+                "Assessment",
+                assessment_ids,
+                index=assessment_ids.index(assessment.assessment_id),
+                format_func=lambda a: bank.assessments[a].title
+            )
+        if st.button("▶️ Start Assessment", key="student_btn", use_container_width=True):
+            st.session_state.page = 'student_login'
+            st.rerun()
+    
+    with col2:
+        st.subheader("👨‍🏫 Instructor Mode")
+        st.info("📊 View analytics and student performance")
+        if st.button("🔓 Instructor Login", key="instructor_btn", use_container_width=True):
+            st.session_state.page = 'instructor_login'
+            st.rerun()
+
+def start_new_attempt(name, email, phone):
+    st.session_state.student_name = name
+    st.session_state.student_email = email
+    st.session_state.student_phone = phone
+    st.session_state.attempt_id = uuid.uuid4().hex
+    st.session_state.answers = None
+    st.session_state.section = 0
+    st.session_state.page = 'assessment'
+    st.query_params['attempt'] = st.session_state.attempt_id
+    begin_attempt(current_assessment())
+    get_event_bus().publish('started', attempt_id=st.session_state.attempt_id, name=name,
+                            assessment_id=st.session_state.assessment_id)
+
+@metrics.timed("page.student_login")
+def student_login_page():
+    assessment = current_assessment()
+    st.markdown(f"""
+        <div class="header-container">
+            <h1>📋 {assessment.title}</h1>
+            <p style='font-size: 18px; margin: 10px 0;'>Student Information</p>
+        </div>
+    """, unsafe_allow_html=True)
+    
+    st.write("---")
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        st.subheader("📝 Enter Your Details")
+        
+        name = st.text_input("Full Name *", placeholder="Enter your full name")
+        email = st.text_input("Email ID *", placeholder="Enter your email")
+        phone = st.text_input("Phone Number *", placeholder="Enter 10-digit phone number")
+        
+        st.write("---")
+        
+        col_submit, col_back = st.columns([1, 1])
+        
+        with col_submit:
+            if st.button("▶️ Start Assessment", use_container_width=True):
+                errors = []
+                
+                if not validate_name(name):
+                    errors.append("Name must be at least 3 characters")
+                if not validate_email(email):
+                    errors.append("Invalid email format")
+                if not validate_phone(phone):
+                    errors.append("Phone must be 10 digits")
+                
+                if not errors:
+                    error, registration = check_registration(assessment, email, phone)
+                    if error:
+                        errors.append(error)
+                    else:
+                        # A roster cohort wins; otherwise the link's, so an earlier candidate's never carries over.
+                        st.session_state.cohort = (registration[3] if registration else "") or link_cohort()
+                        if registration is not None:
+                            email = registration[0]
+                
+                if errors:
+                    for error in errors:
+                        st.error(error)
+                else:
+                    previous = get_response_store().find_open_attempt(email, assessment.assessment_id)
+                    if previous is not None and previous['phone'] == phone:
+                        st.session_state.resume_offer = previous
+                    else:
+                        start_new_attempt(name, email, phone)
+                        st.rerun()
+        
+        with col_back:
+            if st.button("Back", use_container_width=True):
+                st.session_state.page = 'home'
+                st.rerun()
+        
+        previous = st.session_state.get('resume_offer')
+        if previous is not None and previous['email'].lower() == email.strip().lower():
+            answered = len(previous['answers']) - previous['answers'].count(0)
+            st.info(
+                f"You have an unfinished attempt ({answered}/{assessment.paper_size} answered, "
+                f"last saved {previous['updated_at'][:16].replace('T', ' ')}). Resume it or start over?"
+            )
+            col_resume, col_new = st.columns(2)
+            with col_resume:
+                if st.button("Resume Attempt", use_container_width=True):
+                    del st.session_state.resume_offer
+                    # The attempt may have been submitted or closed since the offer was made.
+                    error = resume_attempt(get_response_store().load_attempt(previous['attempt_id']) or previous)
+                    if error:
+                        st.error(error)
+                    else:
+                        st.rerun()
+            with col_new:
+                if st.button("Start Over", use_container_width=True):
+                    del st.session_state.resume_offer
+                    get_response_store().set_attempt_status(previous['attempt_id'], 'abandoned')
+                    get_autosaver().discard(previous['attempt_id'])
+                    start_new_attempt(name, previous['email'], phone)
+                    st.rerun()
+    
+    with col2:
+        st.subheader("Assessment Details")
+        topics = "\n".join(f"        - {topic}" for topic in assessment.topics_covered)
+        st.markdown(f"""
+        Format: Multiple Choice (MCQ)
+        
+        Total Questions: {questions_line(assessment)}
+        
+        Time: {assessment.time_limit_minutes} minutes, counted from when you start
+        
+        Score: 1 point per correct answer
+        
+        Pass Mark: {assessment.pass_score} points ({assessment.pass_percentage:.0f}%)
+        
+        Topics Covered:
+{topics}
+        """)
+
+def questions_line(assessment):
+    spec = assessment.adaptive
+    if spec is None:
+        return str(assessment.paper_size)
+    if spec.min_items == spec.max_items:
+        return f"{spec.max_items}, each chosen from your earlier answers"
+    return f"{spec.min_items} to {spec.max_items}, each chosen from your earlier answers"
+
+@metrics.timed("page.assessment")
+def assessment_page():
+    if attempt_expired():
+        st.session_state.time_up = True
+        st.session_state.page = 'results'
+        st.rerun()
+    
+    assessment = current_assessment()
+    st.markdown(f"""
+        <div class="header-container">
+            <h1>📋 {assessment.title}</h1>
+            <p>Student: <b>{st.session_state.student_name}</b></p>
+        </div>
+    """, unsafe_allow_html=True)
+    
+    left = seconds_left()
+    if left is not None:
+        # Counts down in the browser; the server only checks the deadline when the candidate acts.
+        theme.countdown(left)
+    
+    st.write("---")
+    
+    if answer_sheet().paper.adaptive:
+        adaptive_section(assessment)
+    else:
+        assessment_section(assessment)
+
+def commit_section(assessment, questions, move):
+    sheet = answer_sheet()
+    late = attempt_expired(DEADLINE_GRACE_SECONDS)
+    for q in questions:
+        selected = st.session_state.pop(f"q_{q.number}", None)
+        if selected and not late:
+            sheet.set(q.number, selected)
+    
+    save_attempt_progress()
+    
+    if attempt_expired():
+        st.session_state.time_up = True
+        st.session_state.page = 'results'
+    elif move == 'submit':
+        missing = sheet.missing()
+        if missing:
+            st.session_state.section_error = (
+                f"Please answer all {assessment.paper_size} questions "
+                f"(missing: {', '.join(f'Q{sheet.paper.position(n)}' for n in missing)})"
+            )
+        else:
+            st.session_state.page = 'results'
+    else:
+        st.session_state.section += move
+
+def question_input(paper, sheet, q):
+    with st.expander(f"Q{paper.position(q.number)}: {q.topic} [{q.difficulty}]", expanded=True):
+        st.write(q.question)
+        
+        # Options are the canonical letters in this paper's order, so the
+        # widget value can be stored without remapping.
+        order = paper.option_orders[paper.column[q.number]]
+        current = sheet.get(q.number)
+        st.radio(
+            label="Select your answer:",
+            options=list(order),
+            index=order.index(current) if current in order else None,
+            format_func=lambda x: f"{paper.display_letter(q.number, x)}) {q.options[x]}",
+            key=f"q_{q.number}",
+            label_visibility="collapsed"
+        )
+
+@st.fragment
+@metrics.timed("fragment.assessment_section")
+def assessment_section(assessment):
+    if st.session_state.page != 'assessment':
+        st.rerun()
+    
+    sheet = answer_sheet()
+    paper = sheet.paper
+    sections = paginate_questions(paper, QUESTIONS_PER_SECTION)
+    section = min(st.session_state.section, len(sections) - 1)
+    title, questions = sections[section]
+    
+    total_q = paper.size
+    answered = sheet.answered_count()
+    progress = answered / total_q if total_q > 0 else 0
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.progress(progress)
+        st.caption(f"Section {section + 1} of {len(sections)}: {title}")
+    with col2:
+        st.metric("Progress", f"{answered}/{total_q}")
+    
+    st.write("---")
+    
+    with st.form(f"section_{section}"):
+        for q in questions:
+            question_input(paper, sheet, q)
+        
+        st.write("---")
+        
+        col1, col2, col3 = st.columns([1, 1, 1])
+        with col1:
+            st.form_submit_button(
+                "Previous", disabled=section == 0, use_container_width=True,
+                on_click=commit_section, args=(assessment, questions, -1)
+            )
+        with col2:
+            st.form_submit_button(
+                "Save Progress", use_container_width=True,
+                on_click=commit_section, args=(assessment, questions, 0)
+            )
+        with col3:
+            if section == len(sections) - 1:
+                st.form_submit_button(
+                    "Submit Assessment", use_container_width=True,
+                    on_click=commit_section, args=(assessment, questions, 'submit')
+                )
+            else:
+                st.form_submit_button(
+                    "Next", use_container_width=True,
+                    on_click=commit_section, args=(assessment, questions, 1)
+                )
+    
+    if st.session_state.get('section_error'):
+        st.error(st.session_state.pop('section_error'))
+
+def commit_adaptive(assessment, q):
+    sheet = answer_sheet()
+    selected = st.session_state.pop(f"q_{q.number}", None)
+    if selected and not attempt_expired(DEADLINE_GRACE_SECONDS):
+        sheet.set(q.number, selected)
+    
+    if attempt_expired():
+        save_attempt_progress()
+        st.session_state.time_up = True
+        st.session_state.page = 'results'
+    elif not selected:
+        st.session_state.section_error = "Please choose an answer to continue"
+    else:
+        finished = advance_adaptive(assessment)
+        save_attempt_progress()
+        if finished:
+            st.session_state.page = 'results'
+
+@st.fragment
+@metrics.timed("fragment.adaptive_section")
+def adaptive_section(assessment):
+    if st.session_state.page != 'assessment':
+        st.rerun()
+    
+    sheet = answer_sheet()
+    paper = sheet.paper
+    q = paper.questions[-1]
+    limit = assessment.adaptive.max_items
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.progress(min(sheet.answered_count() / limit, 1.0))
+        st.caption("Each question is chosen from your earlier answers, so answers cannot be changed later.")
+    with col2:
+        st.metric("Question", f"{paper.size} of up to {limit}")
+    
+    st.write("---")
+    
+    with st.form(f"adaptive_{paper.size}"):
+        question_input(paper, sheet, q)
+        st.form_submit_button(
+            "Next", use_container_width=True,
+            on_click=commit_adaptive, args=(assessment, q)
+        )
+    
+    if st.session_state.get('section_error'):
+        st.error(st.session_state.pop('section_error'))
+
+@metrics.timed("page.results")
+def results_page():
+    assessment = current_assessment()
+    sheet = answer_sheet()
+    paper = sheet.paper
+    responses = sheet.to_responses()
+    score, correct_answers = calculate_score(sheet)
+    total_q = paper.size
+    percentage = (score / total_q) * 100 if total_q > 0 else 0
+    
+    save_response(
+        st.session_state.student_email,
+        responses,
+        st.session_state.student_name,
+        st.session_state.student_phone,
+        st.session_state.attempt_id,
+        assessment.assessment_id,
+        st.session_state.cohort
+    )
+    
+    st.markdown(f"""
+        <div class="header-container">
+            <h1>📊 Your Results</h1>
+            <p>Student: <b>{st.session_state.student_name}</b></p>
+        </div>
+    """, unsafe_allow_html=True)
+    
+    if st.session_state.pop('time_up', False):
+        st.warning("Time is up. Your answers were submitted automatically.")
+    
+    st.write("---")
+    
+    ability = estimate_ability(sheet)
+    columns = st.columns(4 if ability else 3)
+    with columns[0]:
+        st.metric("Score", f"{score}/{total_q}")
+    with columns[1]:
+        st.metric("Percentage", f"{percentage:.1f}%")
+    with columns[2]:
+        status = "PASSED" if score >= assessment.pass_score else "FAILED"
+        st.metric("Status", status)
+    if ability:
+        with columns[3]:
+            theta, se = ability
+            st.metric("Ability (θ)", f"{theta:+.2f} ± {se:.2f}",
+                      help="IRT ability estimate on the calibrated scale: 0 is the average candidate.")
+    
+    st.write("---")
+    
+    if percentage >= 85:
+        st.markdown("""
+            <div class="success-box">
+            <h3>Excellent Performance!</h3>
+            <p>You have demonstrated excellent understanding of AI concepts. Ready for advanced applications!</p>
+            </div>
+        """, unsafe_allow_html=True)
+    elif score >= assessment.pass_score:
+        st.markdown("""
+            <div class="success-box">
+            <h3>Passed!</h3>
+            <p>You have met the competency level. Review incorrect answers before applying to practice.</p>
+            </div>
+        """, unsafe_allow_html=True)
+    else:
+        st.markdown("""
+            <div class="error-box">
+            <h3>Below Passing</h3>
+            <p>Review the material and try again. Foundation in AI concepts is essential.</p>
+            </div>
+        """, unsafe_allow_html=True)
+    
+    st.write("---")
+    
+    st.subheader("Answer Review")
+    
+    for q in paper.questions:
+        your = responses.get(str(q.number))
+        correct = correct_answers[q.number]
+        is_correct = your == correct
+        your_label = f"{paper.display_letter(q.number, your)}) {q.options[your]}" if your else "N/A"
+        
+        box = f"""
+        <div class="{'success-box' if is_correct else 'error-box'}">
+        <h4>Q{paper.position(q.number)}: {q.topic}</h4>
+        <p><b>Your:</b> {your_label}</p>
+        <p><b>Correct:</b> {paper.display_letter(q.number, correct)}) {q.options[correct]}</p>
+        <p>{'Correct' if is_correct else 'Incorrect'}</p>
+        </div>
+        """
+        st.markdown(box, unsafe_allow_html=True)
+    
+    st.write("---")
+    
+    if st.button("Retake Assessment"):
+        st.session_state.answers = None
+        st.session_state.student_name = ""
+        st.session_state.student_email = ""
+        st.session_state.student_phone = ""
+        st.session_state.attempt_id = ""
+        st.session_state.cohort = link_cohort()
+        st.session_state.deadline = None
+        st.session_state.section = 0
+        st.session_state.page = 'home'
+        # Keep ?cohort=... so the next candidate on this device lands in the same cohort.
+        if 'attempt' in st.query_params:
+            del st.query_params['attempt']
+        st.rerun()
@@ -0,0 +1,41 @@
+import os
+
+import streamlit as st
+
+# Read once per process; every rerun only re-sends the finished tag.
+with open(os.path.join(os.path.dirname(__file__), "styles.css"), encoding="utf-8") as f:
+    STYLES = f"<style>\n{f.read()}</style>"
+
+# Runs in the candidate's browser, so a ticking clock costs the server nothing.
+COUNTDOWN = """
+<div id="countdown" style="font: 600 18px sans-serif; text-align: right; color: #1f4e79;"></div>
+<script>
+const end = Date.now() + __MILLISECONDS__;
+const el = document.getElementById("countdown");
+function tick() {
+    const left = Math.max(0, Math.round((end - Date.now()) / 1000));
+    const minutes = Math.floor(left / 60), seconds = String(left % 60).padStart(2, "0");
+    el.textContent = left ? `⏱ ${minutes}:${seconds} remaining` : "⏱ Time is up. Your answers will be submitted.";
+    if (left <= 300) el.style.color = "#c0392b";
+    if (left) setTimeout(tick, 1000);
+}
+tick();
+</script>
+"""
+
+
+def configure_page(title):
+    st.set_page_config(
+        page_title=title,
+        page_icon="📋",
+        layout="wide",
+        initial_sidebar_state="collapsed"
+    )
+
+
+def inject_styles():
+    st.markdown(STYLES, unsafe_allow_html=True)
+
+
+def countdown(seconds_left):
+    st.iframe(COUNTDOWN.replace("__MILLISECONDS__", str(max(int(seconds_left * 1000), 0))), height=32)
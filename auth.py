@@ -0,0 +1,190 @@
+"""Instructor authentication: salted scrypt hashes, login throttling and session tokens.
+
+Generate a hash for the ``INSTRUCTOR_PASSWORD_HASH`` environment variable with:
+
+    python auth.py
+"""
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+
+def _b64(data):
+    return base64.b64encode(data).decode('ascii')
+
+
+def hash_password(password, salt=None, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+    """Return ``scrypt$n$r$p$salt$hash`` for ``password`` with a random salt."""
+    salt = salt or os.urandom(SALT_BYTES)
+    digest = hashlib.scrypt(password.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+                            maxmem=256 * n * r, dklen=HASH_BYTES)
+    return f"scrypt${n}${r}${p}${_b64(salt)}${_b64(digest)}"
+
+
+def verify_password(password, encoded):
+    try:
+        scheme, n, r, p, salt, digest = encoded.split("$")
+        if scheme != "scrypt":
+            return False
+        n, r, p = int(n), int(r), int(p)
+        salt = base64.b64decode(salt)
+        expected = base64.b64decode(digest)
+    except ValueError:
+        return False
+    try:
+        actual = hashlib.scrypt(password.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+                                maxmem=256 * n * r, dklen=len(expected))
+    except (ValueError, OverflowError):
+        # Parameters OpenSSL rejects: a malformed or tampered hash never verifies.
+        return False
+    return hmac.compare_digest(actual, expected)
+
+
+class LoginThrottle:
+    """Lock a client key out after ``max_failures`` failed logins within ``window`` seconds."""
+
+    def __init__(self, max_failures=5, window=900.0):
+        self.max_failures = max_failures
+        self.window = window
+        self._failures = {}
+        self._lock = threading.Lock()
+
+    def _recent(self, key, now):
+        failures = self._failures.get(key)
+        if failures is None:
+            return None
+        while failures and now - failures[0] > self.window:
+            failures.popleft()
+        if not failures:
+            del self._failures[key]
+            return None
+        return failures
+
+    def locked_for(self, keys):
+        """Seconds until every key in ``keys`` may try again; 0 when none is locked."""
+        now = time.monotonic()
+        wait = 0.0
+        with self._lock:
+            for key in keys:
+                failures = self._recent(key, now)
+                if failures is not None and len(failures) >= self.max_failures:
+                    wait = max(wait, failures[0] + self.window - now)
+        return wait
+
+    def record_failure(self, keys):
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                failures = self._recent(key, now)
+                if failures is None:
+                    failures = self._failures[key] = deque()
+                failures.append(now)
+
+    def reset(self, keys):
+        with self._lock:
+            for key in keys:
+                self._failures.pop(key, None)
+
+
+class Authenticator:
+    """Checks the instructor password off the script thread and hands out session tokens.
+
+    Hashing runs on a small thread pool so a burst of login attempts can only
+    occupy ``workers`` cores, and at most ``max_pending`` checks are queued or
+    running at once; further logins are turned away without hashing. A
+    verified session holds a random token; later dashboard visits look it up
+    instead of hashing again.
+    """
+
+    def __init__(self, password_hash, max_failures=5, window=900.0, token_ttl=8 * 3600.0,
+                 workers=2, timeout=10.0, max_pending=None):
+        self.password_hash = password_hash
+        self.throttle = LoginThrottle(max_failures, window)
+        self.token_ttl = token_ttl
+        self.timeout = timeout
+        self._tokens = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="auth")
+        self._slots = threading.BoundedSemaphore(max_pending or 2 * workers)
+
+    @property
+    def configured(self):
+        return bool(self.password_hash)
+
+    def login(self, password, client_keys):
+        """Return ``(token, error)``; exactly one of them is ``None``."""
+        if not self.configured:
+            return None, "Instructor login is not configured on this server."
+        wait = self.throttle.locked_for(client_keys)
+        if wait:
+            return None, f"Too many failed attempts. Try again in {int(wait // 60) + 1} minutes."
+        if not self._slots.acquire(blocking=False):
+            return None, "The server is busy. Please try again shortly."
+        future = self._pool.submit(verify_password, password, self.password_hash)
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            ok = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # Counts against the throttle, so a flood of slow logins still ends in a lockout.
+            self.throttle.record_failure(client_keys)
+            return None, "The server is busy. Please try again shortly."
+        if not ok:
+            self.throttle.record_failure(client_keys)
+            return None, "Invalid password!"
+        self.throttle.reset(client_keys)
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            self._tokens[token] = time.monotonic() + self.token_ttl
+        return token, None
+
+    def session_valid(self, token):
+        if not token:
+            return False
+        with self._lock:
+            expires = self._tokens.get(token)
+            if expires is None:
+                return False
+            if expires < time.monotonic():
+                del self._tokens[token]
+                return False
+        return True
+
+    def logout(self, token):
+        with self._lock:
+            self._tokens.pop(token, None)
+
+
+def configured_password_hash():
+    """The instructor password hash from the environment.
+
+    ``INSTRUCTOR_PASSWORD_HASH`` is preferred. A plain ``INSTRUCTOR_PASSWORD``
+    is accepted for local use and hashed once at startup, so the plain text
+    is never compared directly.
+    """
+    encoded = os.environ.get("INSTRUCTOR_PASSWORD_HASH")
+    if encoded:
+        return encoded
+    password = os.environ.get("INSTRUCTOR_PASSWORD")
+    return hash_password(password) if password else None
+
+
+if __name__ == "__main__":
+    import getpass
+
+    first = getpass.getpass("New instructor password: ")
+    if first != getpass.getpass("Repeat password: "):
+        raise SystemExit("Passwords do not match.")
+    print(hash_password(first))
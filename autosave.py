@@ -0,0 +1,94 @@
+import atexit
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class AttemptAutosaver:
+    """Coalesces in-progress answer saves and writes them in periodic batches.
+
+    Pages ``stage`` an attempt's latest answers; only the newest state per
+    attempt is kept, unchanged answers are dropped, and a background thread
+    writes everything pending in a single transaction every ``interval``
+    seconds. A crash loses at most one interval of progress.
+    """
+
+    def __init__(self, store, interval=5.0):
+        self.store = store
+        self.interval = interval
+        self._pending = {}
+        self._saved = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.staged = 0
+        self.coalesced = 0
+        self.unchanged = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self._thread = threading.Thread(target=self._run, name="attempt-autosave", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def stage(self, attempt_id, email, assessment_id, name, phone, answers):
+        answers = bytes(answers)
+        with self._lock:
+            self.staged += 1
+            if attempt_id in self._pending:
+                self.coalesced += 1
+            elif self._saved.get(attempt_id) == answers:
+                self.unchanged += 1
+                return
+            self._pending[attempt_id] = (attempt_id, email, assessment_id, name, phone, answers)
+
+    def pending_answers(self, attempt_id):
+        with self._lock:
+            record = self._pending.get(attempt_id)
+        return record[5] if record else None
+
+    def discard(self, attempt_id):
+        with self._lock:
+            self._pending.pop(attempt_id, None)
+            self._saved.pop(attempt_id, None)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._pending.values())
+                self._pending.clear()
+            if not batch:
+                return 0
+            try:
+                self.store.save_attempts(batch)
+            except Exception:
+                logger.exception("Autosave of %d attempts failed; will retry", len(batch))
+                with self._lock:
+                    for record in batch:
+                        self._pending.setdefault(record[0], record)
+                return 0
+            with self._lock:
+                for record in batch:
+                    self._saved[record[0]] = record[5]
+                self.flushes += 1
+                self.rows_written += len(batch)
+            return len(batch)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'staged': self.staged,
+                'coalesced': self.coalesced,
+                'unchanged': self.unchanged,
+                'pending': len(self._pending),
+                'flushes': self.flushes,
+                'rows_written': self.rows_written
+            }
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
@@ -0,0 +1,88 @@
+"""Calibration speed, parameter recovery and adaptive test length on simulated candidates.
+
+Responses are drawn from a 2PL model with known item parameters; each
+calibration candidate sees a random ``--paper`` questions of the pool. The
+benchmark fits the parameters with ``irt.fit_2pl``, reports how closely they
+match the truth, then runs simulated adaptive sittings against the fitted
+table and reports the per-question selection time, the test length and how
+far the final ability estimate lands from the true ability. Run from the
+repository root:
+
+    python benchmarks/adaptive.py --candidates 20000 --pool 60 --paper 15
+"""
+import argparse
+import time
+
+import numpy as np
+
+import common
+from irt import ItemTable, fit_2pl  # noqa: E402
+
+
+def simulate_calibration_data(n, pool, paper, a, b, rng):
+    theta = rng.normal(size=n)
+    shown = np.argsort(rng.random((n, pool)), axis=1)[:, :paper]
+    presented = np.zeros((n, pool), dtype=bool)
+    presented[np.arange(n)[:, None], shown] = True
+    p = 1 / (1 + np.exp(-a * (theta[:, None] - b)))
+    return (rng.random((n, pool)) < p) & presented, presented
+
+
+def adaptive_sitting(table, theta, a, b, max_items, min_items, target_se, rng):
+    administered, right = [], []
+    estimate, se = 0.0, 1.0
+    step_times = []
+    while len(administered) < max_items and not (len(administered) >= min_items and se <= target_se):
+        started = time.perf_counter()
+        q_num = table.next_item(estimate, set(administered))
+        step_times.append(time.perf_counter() - started)
+        if q_num is None:
+            break
+        administered.append(q_num)
+        right.append(rng.random() < 1 / (1 + np.exp(-a[q_num] * (theta - b[q_num]))))
+        started = time.perf_counter()
+        estimate, se = table.estimate(administered, right)
+        step_times[-1] += time.perf_counter() - started
+    return len(administered), estimate, se, step_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=20000, help="calibration sample size")
+    parser.add_argument("--pool", type=int, default=60, help="questions in the pool")
+    parser.add_argument("--paper", type=int, default=15, help="questions each calibration candidate saw")
+    parser.add_argument("--sittings", type=int, default=500, help="simulated adaptive sittings")
+    parser.add_argument("--max-items", type=int, default=15)
+    parser.add_argument("--min-items", type=int, default=8)
+    parser.add_argument("--target-se", type=float, default=0.4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    a = rng.uniform(0.6, 2.2, args.pool)
+    b = rng.normal(0, 1, args.pool)
+    correct, presented = simulate_calibration_data(args.candidates, args.pool, args.paper, a, b, rng)
+    started = time.perf_counter()
+    fitted_a, fitted_b, iterations = fit_2pl(correct, presented)
+    elapsed = time.perf_counter() - started
+    print(f"calibration: {args.candidates} candidates x {args.paper}/{args.pool} items in {elapsed:.2f}s "
+          f"({iterations} EM iterations); correlation with true a {np.corrcoef(a, fitted_a)[0, 1]:.3f}, "
+          f"b {np.corrcoef(b, fitted_b)[0, 1]:.3f}")
+
+    table = ItemTable(range(args.pool), fitted_a, fitted_b)
+    lengths, errors, times = [], [], []
+    for _ in range(args.sittings):
+        theta = rng.normal()
+        length, estimate, _, step_times = adaptive_sitting(
+            table, theta, a, b, args.max_items, args.min_items, args.target_se, rng
+        )
+        lengths.append(length)
+        errors.append(estimate - theta)
+        times.extend(step_times)
+    stats = common.summarize(times)
+    print(f"adaptive: {args.sittings} sittings, mean length {np.mean(lengths):.1f} "
+          f"(range {min(lengths)}-{max(lengths)}), ability RMSE {np.sqrt(np.mean(np.square(errors))):.3f}; "
+          f"per question p50 {stats['p50'] * 1e6:.0f}us p99 {stats['p99'] * 1e6:.0f}us")
+
+
+if __name__ == "__main__":
+    main()
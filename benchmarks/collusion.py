@@ -0,0 +1,61 @@
+"""Speed and recall of collusion screening on synthetic sittings.
+
+Candidates answer at random abilities with a popular, a plausible and a
+rare distractor per question. A number of copying pairs are planted, where
+one candidate copies another and fixes about one answer in ten. The
+benchmark reports screening time, how many pairs were compared and how many
+planted pairs rank in the top ``2 * pairs``. Run from the repository root:
+
+    python benchmarks/collusion.py --sizes 2000 20000 --questions 15 60
+"""
+import argparse
+import time
+
+import numpy as np
+
+import common  # noqa: F401
+from collusion import screen_answers  # noqa: E402
+
+
+def synthetic_sitting(n, q, pairs, rng):
+    correct = rng.integers(1, 5, q).astype(np.uint8)
+    others = np.array([[o for o in range(1, 5) if o != c] for c in correct], dtype=np.uint8)
+    ability = rng.uniform(0.3, 0.9, n)
+    right = rng.random((n, q)) < ability[:, None]
+    distractor = rng.choice(3, size=(n, q), p=[0.6, 0.3, 0.1])
+    matrix = np.where(right, correct, others[np.arange(q), distractor]).astype(np.uint8)
+    chosen = rng.choice(n, 2 * pairs, replace=False)
+    sources, copiers = chosen[:pairs], chosen[pairs:]
+    for source, copier in zip(sources, copiers):
+        matrix[source] = np.where(rng.random(q) < 0.6, correct, others[np.arange(q), rng.integers(0, 3, q)])
+        matrix[copier] = matrix[source]
+        fixed = rng.random(q) < 0.1
+        matrix[copier, fixed] = correct[fixed]
+    planted = {tuple(sorted(pair)) for pair in zip(sources.tolist(), copiers.tolist())}
+    return matrix, correct, planted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 20000], help="candidates per sitting")
+    parser.add_argument("--questions", type=int, nargs="+", default=[15, 60], help="questions per paper")
+    parser.add_argument("--pairs", type=int, default=20, help="copying pairs to plant")
+    parser.add_argument("--workers", type=int, default=1, help="screening processes")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for q in args.questions:
+        for n in args.sizes:
+            matrix, correct, planted = synthetic_sitting(n, q, args.pairs, rng)
+            started = time.perf_counter()
+            result = screen_answers(matrix, correct, workers=args.workers)
+            elapsed = time.perf_counter() - started
+            top = set(zip(result['first'][:2 * args.pairs].tolist(), result['second'][:2 * args.pairs].tolist()))
+            found = len(planted & {tuple(sorted(pair)) for pair in top})
+            print(f"{n:>7} candidates x {q:>3} questions  {result['method']:<5} {elapsed * 1000:9.1f}ms  "
+                  f"compared {result['compared']:>9} of {n * (n - 1) // 2:>12} pairs  "
+                  f"planted pairs in top {2 * args.pairs}: {found}/{args.pairs}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import os
+import random
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, "streamlit_app.py")
+
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(values):
+    return {
+        'n': len(values),
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': max(values) if values else 0.0
+    }
+
+
+def format_ms(stats):
+    return (f"n={stats['n']:<6} p50={stats['p50'] * 1000:8.2f}ms p95={stats['p95'] * 1000:8.2f}ms "
+            f"p99={stats['p99'] * 1000:8.2f}ms max={stats['max'] * 1000:8.2f}ms")
+
+
+def temporary_store_url():
+    return f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-'), 'responses.db')}"
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def seed_submissions(store, assessment, count, seed=0, chunk=20000):
+    """Bulk-insert ``count`` random submissions for ``assessment``."""
+    rng = random.Random(seed)
+    letters = "abcd"
+    keys = [str(q.number) for q in assessment.questions]
+    inserted = 0
+    while inserted < count:
+        n = min(chunk, count - inserted)
+        submissions = []
+        for i in range(inserted, inserted + n):
+            submissions.append({
+                'timestamp': "20240101_000000",
+                'name': f"Candidate {i}",
+                'email': f"candidate{i}@example.com",
+                'phone': "9999999999",
+                'responses': {k: letters[rng.randrange(4)] for k in keys},
+                'submission_id': f"seed:{seed}:{i}",
+                'assessment_id': assessment.assessment_id
+            })
+        store.save_many(submissions)
+        inserted += n
@@ -0,0 +1,117 @@
+"""Micro-benchmark of dashboard loading at increasing submission counts.
+
+Run from the repository root:
+
+    python benchmarks/dashboard_load.py --sizes 1000 10000 100000
+
+For each size a fresh store is seeded. The benchmark then times the first
+full load of the dashboard aggregates (what load_all_responses used to do
+on every rerun), a refresh with nothing new, a refresh after one new
+submission, and the first build of the students table. It also reports
+how many bytes of chart data the dashboard sends, which should not change
+with size. Unless --no-app is given, it also times complete
+dashboard_page reruns through AppTest.
+"""
+import argparse
+import os
+import time
+
+from common import APP_PATH, REPO_ROOT, format_ms, summarize, seed_submissions, temporary_store_url
+
+
+def timed(fn, repeat=1):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_aggregates(store, assessment, repeat):
+    from aggregates import DashboardAggregates
+
+    aggregates = DashboardAggregates(assessment)
+    cold = timed(lambda: aggregates.refresh(store))
+    warm = timed(lambda: aggregates.refresh(store), repeat)
+
+    responses = {str(q.number): q.correct for q in assessment.questions}
+
+    def one_more():
+        store.save("late@example.com", responses, "Late", "9999999999", assessment_id=assessment.assessment_id)
+        aggregates.refresh(store)
+
+    incremental = timed(one_more, repeat)
+    frame = timed(aggregates.students_frame)
+    return cold, warm, incremental, frame, chart_bytes(aggregates)
+
+
+def chart_bytes(aggregates):
+    """Arrow-encoded size of the dashboard chart data, as Streamlit would send it."""
+    import pandas as pd
+    import pyarrow as pa
+
+    frames = [
+        aggregates.score_distribution(),
+        aggregates.question_accuracy(),
+        aggregates.timeline(),
+        pd.DataFrame(list(aggregates.topic_accuracy().items()), columns=['Topic', 'Percentage']),
+        aggregates.item_analysis()
+    ]
+    return sum(pa.Table.from_pandas(frame).nbytes for frame in frames)
+
+
+def bench_page(store_url, repeat):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    # Each size uses a new store, so drop the previous size's cached store and aggregates.
+    st.cache_resource.clear()
+    os.environ["RESPONSE_STORE_URL"] = store_url
+    os.environ.setdefault("INSTRUCTOR_PASSWORD", "benchmark")
+    at = AppTest.from_file(APP_PATH, default_timeout=600)
+    at.session_state.page = 'instructor_login'
+    at.run()
+    at.text_input[0].input(os.environ["INSTRUCTOR_PASSWORD"])
+    [b for b in at.button if b.label == "Login"][0].click()
+    samples = []
+    for _ in range(repeat + 1):
+        started = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - started)
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+    return samples[:1], samples[1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--no-app", action="store_true", help="skip the AppTest page renders")
+    args = parser.parse_args()
+
+    os.chdir(REPO_ROOT)
+    from question_bank import load_question_bank
+    from response_store import open_store
+
+    assessment = load_question_bank().get()
+    for size in args.sizes:
+        store_url = temporary_store_url()
+        store = open_store(store_url)
+        seeded = timed(lambda: seed_submissions(store, assessment, size))[0]
+        print(f"== {size:,} submissions (seeded in {seeded:.1f}s)")
+        cold, warm, incremental, frame, charts = bench_aggregates(store, assessment, args.repeat)
+        print(f"  full load       {format_ms(summarize(cold))}")
+        print(f"  refresh, no new {format_ms(summarize(warm))}")
+        print(f"  refresh, +1     {format_ms(summarize(incremental))}")
+        print(f"  students table  {format_ms(summarize(frame))}")
+        print(f"  chart data      {charts:,} bytes")
+        if not args.no_app:
+            first, rest = bench_page(store_url, min(args.repeat, 5))
+            print(f"  login + page    {format_ms(summarize(first))}")
+            print(f"  page, rerun     {format_ms(summarize(rest))}")
+
+
+if __name__ == "__main__":
+    main()
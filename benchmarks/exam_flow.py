@@ -0,0 +1,130 @@
+"""Headless load test of the candidate flow.
+
+Drives home_page -> student_login_page -> assessment_page -> results_page with
+Streamlit's AppTest. Each worker process plays candidates one after another,
+and all workers run at once. Run from the repository root:
+
+    python benchmarks/exam_flow.py --concurrency 8 --candidates 25
+
+Reports rerun latency percentiles per page and overall, resident memory
+per live session, and submission throughput through save_response, plus a
+direct save_response write benchmark with the same concurrency.
+"""
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+
+from common import APP_PATH, REPO_ROOT, format_ms, rss_bytes, summarize, temporary_store_url
+
+
+def timed_run(at, page, latencies):
+    started = time.perf_counter()
+    at.run()
+    latencies.setdefault(page, []).append(time.perf_counter() - started)
+    if at.exception:
+        raise RuntimeError(f"{page}: {at.exception[0].message}")
+
+
+def play_candidate(worker, n, latencies):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    timed_run(at, 'home', latencies)
+
+    at.button(key="student_btn").click()
+    timed_run(at, 'student_login', latencies)
+
+    at.text_input[0].input(f"Candidate {worker}-{n}")
+    at.text_input[1].input(f"w{worker}.c{n}@example.com")
+    at.text_input[2].input("9999999999")
+    [b for b in at.button if "Start Assessment" in b.label][0].click()
+    timed_run(at, 'assessment', latencies)
+
+    while at.session_state.page == 'assessment':
+        for i, radio in enumerate(at.radio):
+            radio.set_value("abcd"[(n + i) % 4])
+        labels = [b.label for b in at.button]
+        label = "Submit Assessment" if "Submit Assessment" in labels else "Next"
+        [b for b in at.button if b.label == label][0].click()
+        timed_run(at, 'assessment', latencies)
+
+    # The submit rerun switches pages; the next rerun renders and saves the results.
+    timed_run(at, 'results', latencies)
+    return at
+
+
+def run_worker(args):
+    worker, candidates, store_url = args
+    os.environ["RESPONSE_STORE_URL"] = store_url
+    os.chdir(REPO_ROOT)
+    # One untimed candidate first, so imports and caches don't count against sessions.
+    play_candidate(worker, -1, {})
+    latencies = {}
+    sessions = []
+    baseline = rss_bytes()
+    started = time.perf_counter()
+    for n in range(candidates):
+        sessions.append(play_candidate(worker, n, latencies))
+    elapsed = time.perf_counter() - started
+    per_session = (rss_bytes() - baseline) / max(len(sessions), 1)
+    return latencies, elapsed, per_session, len(sessions)
+
+
+def bench_writes(store_url, concurrency, writes_per_thread):
+    from response_store import open_store, submission_key
+
+    store = open_store(store_url)
+    responses = {str(q): "abcd"[q % 4] for q in range(1, 16)}
+
+    def writer(t):
+        for i in range(writes_per_thread):
+            email = f"writer{t}.{i}@example.com"
+            store.save(email, responses, "Writer", "9999999999",
+                       submission_id=submission_key(email, f"bench-{t}-{i}"))
+
+    threads = [threading.Thread(target=writer, args=(t,)) for t in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return concurrency * writes_per_thread / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=4, help="simultaneous candidate processes")
+    parser.add_argument("--candidates", type=int, default=10, help="candidates per process")
+    parser.add_argument("--writes", type=int, default=500, help="save_response calls per thread in the write benchmark")
+    parser.add_argument("--store", help="store URL (default: a fresh temporary SQLite file)")
+    args = parser.parse_args()
+
+    store_url = args.store or temporary_store_url()
+    started = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(args.concurrency) as pool:
+        results = pool.map(run_worker, [(w, args.candidates, store_url) for w in range(args.concurrency)])
+    wall = time.perf_counter() - started
+
+    merged = {}
+    for latencies, _, _, _ in results:
+        for page, values in latencies.items():
+            merged.setdefault(page, []).extend(values)
+    completed = sum(count for _, _, _, count in results)
+    per_session = sum(mem for _, _, mem, _ in results) / len(results)
+
+    print(f"concurrency={args.concurrency} candidates={completed} store={store_url}")
+    print("rerun latency:")
+    for page in ('home', 'student_login', 'assessment', 'results'):
+        print(f"  {page:<14} {format_ms(summarize(merged.get(page, [])))}")
+    print(f"  {'all':<14} {format_ms(summarize([v for values in merged.values() for v in values]))}")
+    print(f"memory per session: {per_session / 1024:,.1f} KiB (RSS growth / live sessions)")
+    print(f"flow throughput:    {completed / wall:,.1f} submissions/s")
+    print(f"save_response:      {bench_writes(store_url, args.concurrency, args.writes):,.0f} writes/s "
+          f"({args.concurrency} threads)")
+
+
+if __name__ == "__main__":
+    main()
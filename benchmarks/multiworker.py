@@ -0,0 +1,147 @@
+"""Local multi-process harness for the shared response store.
+
+Simulates several app workers sharing one store, the way N Streamlit
+processes behind a load balancer would. Run from the repository root:
+
+    python benchmarks/multiworker.py --workers 4 --candidates 500
+    python benchmarks/multiworker.py --serve 3   # start 3 real app workers
+
+The simulation phase has every worker start attempts and save progress.
+The handoff phase makes each worker finish attempts another worker
+started, as after a reconnect to a different process, submitting each
+one twice. The checks require every attempt to be stored exactly once
+and marked submitted.
+"""
+import argparse
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from response_store import open_store, submission_key  # noqa: E402
+
+NUM_QUESTIONS = 15
+ASSESSMENT_ID = "day1"
+
+
+def candidate_email(worker, n):
+    return f"w{worker}-c{n}@example.com"
+
+
+def start_attempts(args):
+    url, worker, candidates, sections = args
+    store = open_store(url)
+    started = time.perf_counter()
+    for n in range(candidates):
+        attempt_id = f"w{worker}-a{n}"
+        answers = bytearray(NUM_QUESTIONS)
+        for section in range(sections):
+            for q in range(section * NUM_QUESTIONS // sections, (section + 1) * NUM_QUESTIONS // sections):
+                answers[q] = 1 + (n + q) % 4
+            store.save_attempt(attempt_id, candidate_email(worker, n), ASSESSMENT_ID, f"Candidate {n}", "9999999999", answers)
+    return candidates * sections, time.perf_counter() - started
+
+
+def finish_attempts(args):
+    url, worker, owner, candidates = args
+    store = open_store(url)
+    started = time.perf_counter()
+    for n in range(candidates):
+        attempt = store.load_attempt(f"w{owner}-a{n}")
+        responses = {str(q + 1): "abcd"[code - 1] for q, code in enumerate(attempt['answers']) if code}
+        for _ in range(2):
+            store.save(
+                attempt['email'], responses, attempt['name'], attempt['phone'],
+                submission_id=submission_key(attempt['email'], attempt['attempt_id']),
+                assessment_id=attempt['assessment_id'],
+                attempt_id=attempt['attempt_id']
+            )
+    stats = store.stats()
+    return candidates * 2, time.perf_counter() - started, stats['duplicates_suppressed']
+
+
+def simulate(workers, candidates, sections, url):
+    with multiprocessing.Pool(workers) as pool:
+        wall = time.perf_counter()
+        progress = pool.map(start_attempts, [(url, w, candidates, sections) for w in range(workers)])
+        progress_wall = time.perf_counter() - wall
+
+        wall = time.perf_counter()
+        submits = pool.map(finish_attempts, [(url, w, (w + 1) % workers, candidates) for w in range(workers)])
+        submit_wall = time.perf_counter() - wall
+
+    progress_writes = sum(count for count, _ in progress)
+    submit_writes = sum(count for count, _, _ in submits)
+    suppressed = sum(dup for _, _, dup in submits)
+    print(f"workers={workers} candidates/worker={candidates} store={url}")
+    print(f"progress saves: {progress_writes} in {progress_wall:.2f}s ({progress_writes / progress_wall:,.0f}/s)")
+    print(f"submissions:    {submit_writes} in {submit_wall:.2f}s ({submit_writes / submit_wall:,.0f}/s), "
+          f"duplicates suppressed: {suppressed}")
+
+    store = open_store(url)
+    expected = workers * candidates
+    stored = len(store.load_all())
+    open_attempts = sum(
+        1 for w in range(workers) for n in range(candidates)
+        if store.load_attempt(f"w{w}-a{n}")['status'] != 'submitted'
+    )
+    failures = []
+    if stored != expected:
+        failures.append(f"expected {expected} submissions, found {stored}")
+    if suppressed != expected:
+        failures.append(f"expected {expected} suppressed duplicates, found {suppressed}")
+    if open_attempts:
+        failures.append(f"{open_attempts} attempts were not marked submitted")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK: every attempt stored exactly once and recovered across workers")
+    return not failures
+
+
+def serve(workers, url, base_port):
+    env = dict(os.environ, RESPONSE_STORE_URL=url)
+    app = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "streamlit_app.py")
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", app,
+             "--server.port", str(base_port + i), "--server.headless", "true"],
+            env=env
+        )
+        for i in range(workers)
+    ]
+    print(f"{workers} workers sharing {url}:")
+    for i in range(workers):
+        print(f"  http://localhost:{base_port + i}")
+    try:
+        for process in processes:
+            process.wait()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--candidates", type=int, default=200, help="candidates per worker")
+    parser.add_argument("--sections", type=int, default=3, help="progress saves per attempt")
+    parser.add_argument("--store", help="store URL (default: a fresh temporary SQLite file)")
+    parser.add_argument("--serve", type=int, metavar="N", help="start N streamlit workers instead of simulating")
+    parser.add_argument("--port", type=int, default=8501)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.store or os.environ.get("RESPONSE_STORE_URL", "sqlite:///responses/responses.db"), args.port)
+        return
+
+    url = args.store or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'responses.db')}"
+    sys.exit(0 if simulate(args.workers, args.candidates, args.sections, url) else 1)
+
+
+if __name__ == "__main__":
+    main()
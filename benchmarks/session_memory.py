@@ -0,0 +1,68 @@
+"""Per-session memory of the answer state, before and after AnswerSheet.
+
+Run from the repository root:
+
+    python benchmarks/session_memory.py [sessions]
+
+"Before" models the original layout: a ``responses`` dict of question-number
+strings to letters plus one ``q_{n}`` radio state per question. "After" is an
+AnswerSheet plus the radio states of the one section currently on screen.
+"""
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from answer_sheet import AnswerSheet  # noqa: E402
+from question_bank import load_question_bank  # noqa: E402
+from scoring import OPTIONS  # noqa: E402
+
+QUESTIONS_PER_SECTION = 5
+
+
+def legacy_session(assessment, answers):
+    state = {'responses': {}}
+    for q, answer in zip(assessment.questions, answers):
+        state['responses'][str(q.number)] = answer
+        state[f"q_{q.number}"] = answer
+    return state
+
+
+def compact_session(assessment, answers):
+    sheet = AnswerSheet(assessment.fixed_paper)
+    state = {'answers': sheet}
+    for q, answer in zip(assessment.questions, answers):
+        sheet.set(q.number, answer)
+    for q in assessment.questions[:QUESTIONS_PER_SECTION]:
+        state[f"q_{q.number}"] = sheet.get(q.number)
+    return state
+
+
+def measure(build, assessment, sessions):
+    rng = random.Random(0)
+    answer_sets = [[rng.choice(OPTIONS) for _ in assessment.questions] for _ in range(sessions)]
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    states = [build(assessment, answers) for answers in answer_sets]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del states
+    return total / sessions
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    assessment = load_question_bank().get()
+    legacy = measure(legacy_session, assessment, sessions)
+    compact = measure(compact_session, assessment, sessions)
+    print(f"assessment: {assessment.assessment_id} ({assessment.num_questions} questions), sessions: {sessions}")
+    print(f"before: {legacy:8.0f} bytes/session")
+    print(f"after:  {compact:8.0f} bytes/session")
+    print(f"saved:  {1 - compact / legacy:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Cold start and per-rerun overhead of the candidate pages.
+
+Each sample starts a fresh interpreter, so imports and module-level work
+count against the first render. The child then reruns the home, login
+and first assessment pages with AppTest and reports which heavy modules
+were loaded along the way. Run from the repository root:
+
+    python benchmarks/startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from common import APP_PATH, REPO_ROOT, format_ms, summarize, temporary_store_url
+
+CHILD = r'''
+import json, sys, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+first = time.perf_counter() - started
+
+def reruns(n):
+    samples = []
+    for _ in range(n):
+        t = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - t)
+    return samples
+
+home = reruns(int(sys.argv[2]))
+at.button(key="student_btn").click().run()
+login = reruns(int(sys.argv[2]))
+at.text_input[0].input("Startup Bench")
+at.text_input[1].input("startup@example.com")
+at.text_input[2].input("9999999999")
+[b for b in at.button if "Start Assessment" in b.label][0].click().run()
+assessment = reruns(int(sys.argv[2]))
+heavy = [m for m in ("pandas", "pyarrow", "altair", "openpyxl") if m in sys.modules]
+print(json.dumps({"first": first, "home": home, "login": login, "assessment": assessment, "heavy": heavy}))
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to start")
+    parser.add_argument("--reruns", type=int, default=20, help="reruns per candidate page in each interpreter")
+    args = parser.parse_args()
+
+    results = []
+    for _ in range(args.runs):
+        env = dict(os.environ, RESPONSE_STORE_URL=temporary_store_url())
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD, APP_PATH, str(args.reruns)],
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+
+    print(f"cold start, first render  {format_ms(summarize([r['first'] for r in results]))}")
+    for page in ('home', 'login', 'assessment'):
+        samples = [v for r in results for v in r[page]]
+        print(f"rerun, {page:<18} {format_ms(summarize(samples))}")
+    heavy = sorted({m for r in results for m in r['heavy']})
+    print(f"heavy modules loaded by candidate pages: {', '.join(heavy) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
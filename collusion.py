@@ -0,0 +1,265 @@
+"""Collusion screening: candidate pairs sharing unusually many identical wrong answers.
+
+Each candidate's wrong answers are turned into a set of (question, option)
+tokens, stored sparsely as a list of token ids per candidate, so memory
+follows the number of wrong answers rather than the size of the question
+pool. Small sittings compare every pair exactly. Larger ones first bucket
+candidates by MinHash signatures of their wrong-answer sets (LSH banding)
+and only compare pairs that share a bucket, which avoids the all-pairs
+work while still finding pairs with a high overlap. Only questions both
+candidates answered count towards a pair, so questions one of them was
+never given (pooled or adaptive papers) are not matches.
+
+Pairs are ranked by how surprising their shared wrong answers are. On every
+question both got wrong, the chance that two independent candidates pick
+the same wrong option is estimated from how often each wrong option was
+chosen, and the count of matches is compared with a Poisson tail. A popular
+misconception therefore ranks below a rare shared mistake. This is a
+screening aid for a proctor, not evidence on its own.
+
+Similarity is deliberately not computed on bit-packed wrong-answer vectors
+with AND/popcount. A packed one-hot matrix takes 4 bits per candidate per
+question, however few questions each candidate saw, so memory grows with
+the pool. A popcount also gives only the number of shared wrong answers.
+It does not say which questions they were on, or whether both candidates
+answered them, and the ranking above needs both. Candidate pairs are
+instead compared on their uint8 answer rows (one byte per question), as
+vectorized element-wise compares over chunks of pairs.
+"""
+import math
+
+import numpy as np
+
+from parallel import map_chunks
+from scoring import OPTIONS, encode_responses
+
+NUM_OPTIONS = len(OPTIONS)
+LOAD_CHUNK_SIZE = 5000
+SIGNATURE_CHUNK_SIZE = 2000
+# Pairs are scored in chunks of about this many (pair, question) cells.
+PAIR_CHUNK_CELLS = 4000000
+
+_NO_TOKEN = np.uint32(0xFFFFFFFF)
+
+
+def wrong_answer_tokens(matrix, correct):
+    """Each candidate's wrong options as sparse token ids, in CSR layout.
+
+    Returns ``(indptr, indices)``: candidate ``i`` chose the wrong options
+    ``indices[indptr[i]:indptr[i + 1]]``, where token ``question * 4 + option - 1``.
+    """
+    rows, cols = np.nonzero((matrix != 0) & (matrix != correct))
+    indices = cols * NUM_OPTIONS + matrix[rows, cols].astype(np.intp) - 1
+    indptr = np.zeros(matrix.shape[0] + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=matrix.shape[0]), out=indptr[1:])
+    return indptr, indices
+
+
+def _gather_tokens(indptr, indices, rows):
+    """The tokens of ``rows`` as ``(starts, tokens)``, with ``starts`` relative to ``tokens``."""
+    lengths = indptr[rows + 1] - indptr[rows]
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+    positions = np.repeat(indptr[rows] - starts, lengths) + np.arange(int(lengths.sum()))
+    return starts, indices[positions]
+
+
+def _signatures(task):
+    starts, tokens, hashes = task
+    signatures = np.full((len(starts), hashes.shape[0]), _NO_TOKEN, dtype=np.uint32)
+    filled = np.nonzero(np.diff(np.append(starts, len(tokens))))[0]
+    if len(filled):
+        # Empty rows are skipped, so each reduced segment is exactly one candidate's tokens.
+        signatures[filled] = np.minimum.reduceat(hashes[:, tokens], starts[filled], axis=1).T
+    return signatures
+
+
+def _score_pairs(task):
+    first, second, correct, rate_first, rate_second, item_chance, same_wrong_chance = task
+    answered = (first != 0) & (second != 0)
+    same = (first == second) & answered
+    wrong_first = answered & (first != correct)
+    wrong_second = answered & (second != correct)
+    shared = (same & wrong_first).sum(axis=1, dtype=np.int64)
+    union = (wrong_first | wrong_second).sum(axis=1, dtype=np.int64)
+    identical = same.sum(axis=1, dtype=np.int64)
+    chance = (np.clip(np.outer(rate_first, item_chance), 0.0, 1.0)
+              * np.clip(np.outer(rate_second, item_chance), 0.0, 1.0) * answered)
+    expected = chance @ same_wrong_chance
+    return shared, union, identical, expected
+
+
+def poisson_tail(k, lam):
+    """``P(X >= k)`` for ``X ~ Poisson(lam)``, elementwise."""
+    k = np.asarray(k, dtype=np.int64)
+    lam = np.asarray(lam, dtype=np.float64)
+    term = np.exp(-lam)
+    below = np.zeros_like(lam)
+    for i in range(int(k.max(initial=0))):
+        below += np.where(i < k, term, 0.0)
+        term = term * lam / (i + 1)
+    return np.clip(1.0 - below, 0.0, 1.0)
+
+
+def _lsh_pairs(signatures, bands, max_bucket):
+    n, num_hashes = signatures.shape
+    rows = num_hashes // bands
+    # Fold each band into one 64-bit key; a rare false collision only adds a pair to verify.
+    weights = np.uint64(0x9E3779B97F4A7C15) ** np.arange(rows, dtype=np.uint64)
+    triangles = {}
+    found = []
+    skipped = 0
+    for band in range(bands):
+        keys = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64) @ weights
+        _, groups, sizes = np.unique(keys, return_inverse=True, return_counts=True)
+        order = np.argsort(groups, kind='stable')
+        starts = np.concatenate(([0], np.cumsum(sizes)))
+        for group in np.nonzero(sizes >= 2)[0]:
+            size = int(sizes[group])
+            if size > max_bucket:
+                # A pattern this common is a shared misconception, not a copying pair.
+                skipped += 1
+                continue
+            if size not in triangles:
+                triangles[size] = np.triu_indices(size, 1)
+            first, second = triangles[size]
+            members = order[starts[group]:starts[group + 1]].astype(np.int64)
+            found.append(members[first] * n + members[second])
+    if not found:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), skipped
+    pairs = np.unique(np.concatenate(found))
+    return pairs // n, pairs % n, skipped
+
+
+def screen_answers(matrix, correct, min_shared=3, num_hashes=60, bands=10, max_bucket=500,
+                   exact_limit=500, workers=1, seed=0):
+    """Find candidate pairs sharing at least ``min_shared`` identical wrong answers.
+
+    ``matrix`` is the ``(candidates, questions)`` code matrix and ``correct``
+    the key codes. Returns a dict of pair arrays (``first``, ``second``,
+    ``shared``, ``identical``, ``jaccard``, ``expected``, ``p_value``) sorted
+    most suspicious first, plus counts describing the search.
+    """
+    n, q = matrix.shape
+    indptr, indices = wrong_answer_tokens(matrix, correct)
+    wrong_counts = np.diff(indptr)
+    eligible = np.nonzero(wrong_counts >= min_shared)[0]
+
+    # Chance of each candidate getting each item wrong, from their error rate and the item's.
+    answered_by_candidate = np.maximum((matrix != 0).sum(axis=1), 1)
+    candidate_rate = wrong_counts / answered_by_candidate
+    answered_by_item = np.maximum((matrix != 0).sum(axis=0), 1)
+    item_rate = np.bincount(indices // NUM_OPTIONS, minlength=q) / answered_by_item
+    mean_rate = max(float(candidate_rate.mean()) if n else 0.0, 1e-9)
+    item_chance = item_rate / mean_rate
+    # Chance that two candidates who both miss an item pick the same wrong option.
+    option_counts = np.stack([(matrix == code).sum(axis=0) for code in range(1, NUM_OPTIONS + 1)], axis=1)
+    wrong_counts_by_option = np.where(np.arange(1, NUM_OPTIONS + 1) == correct[:, None], 0, option_counts)
+    totals = wrong_counts_by_option.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shares = np.where(totals > 0, wrong_counts_by_option / totals, 0.0)
+    same_wrong_chance = (shares ** 2).sum(axis=1)
+
+    skipped = 0
+    if len(eligible) <= exact_limit:
+        first, second = np.triu_indices(len(eligible), 1)
+        first, second = eligible[first], eligible[second]
+        method = 'exact'
+    else:
+        rng = np.random.default_rng(seed)
+        hashes = rng.integers(0, 0xFFFFFFFF, size=(num_hashes, q * NUM_OPTIONS), dtype=np.uint32)
+        chunks = (
+            _gather_tokens(indptr, indices, eligible[start:start + SIGNATURE_CHUNK_SIZE]) + (hashes,)
+            for start in range(0, len(eligible), SIGNATURE_CHUNK_SIZE)
+        )
+        signatures = np.concatenate(list(map_chunks(_signatures, chunks, workers)))
+        first, second, skipped = _lsh_pairs(signatures, bands, max_bucket)
+        first, second = eligible[first], eligible[second]
+        method = 'lsh'
+
+    chunk = max(PAIR_CHUNK_CELLS // max(q, 1), 1)
+    tasks = (
+        (matrix[first[start:start + chunk]], matrix[second[start:start + chunk]], correct,
+         candidate_rate[first[start:start + chunk]], candidate_rate[second[start:start + chunk]],
+         item_chance, same_wrong_chance)
+        for start in range(0, len(first), chunk)
+    )
+    parts = list(map_chunks(_score_pairs, tasks, workers))
+    if parts:
+        shared, union, identical, expected = (np.concatenate(column) for column in zip(*parts))
+    else:
+        shared = union = identical = np.zeros(0, dtype=np.int64)
+        expected = np.zeros(0, dtype=np.float64)
+
+    keep = shared >= min_shared
+    first, second = first[keep], second[keep]
+    shared, union, identical, expected = shared[keep], union[keep], identical[keep], expected[keep]
+    p_value = poisson_tail(shared, expected)
+    order = np.lexsort((-shared, p_value))
+    return {
+        'candidates': n,
+        'eligible': int(len(eligible)),
+        'compared': int(keep.size),
+        'skipped_buckets': skipped,
+        'method': method,
+        'first': first[order],
+        'second': second[order],
+        'shared': shared[order],
+        'identical': identical[order],
+        'jaccard': (shared / np.maximum(union, 1))[order],
+        'expected': expected[order],
+        'p_value': p_value[order]
+    }
+
+
+def load_answer_matrix(store, assessment, filters=None, chunk_size=LOAD_CHUNK_SIZE):
+    """The assessment's stored submissions as a code matrix plus per-row details."""
+    key = assessment.key
+    blocks = []
+    details = {'id': [], 'name': [], 'email': [], 'cohort': []}
+    for rows in store.iter_batches(chunk_size, assessment_id=assessment.assessment_id, **(filters or {})):
+        blocks.append(encode_responses([row.get('responses', {}) for row in rows], key))
+        details['id'].extend(row['id'] for row in rows)
+        details['name'].extend(row.get('name') or 'N/A' for row in rows)
+        details['email'].extend(row.get('email') or 'N/A' for row in rows)
+        details['cohort'].extend(row.get('cohort', '') for row in rows)
+    matrix = np.concatenate(blocks) if blocks else np.zeros((0, key.num_questions), dtype=np.uint8)
+    return matrix, details
+
+
+def screen_assessment(store, assessment, filters=None, limit=100, workers=1, **options):
+    """Screen an assessment's submissions and return the top ``limit`` pairs as row dicts.
+
+    Pairs of submissions from the same email (retakes) are left out.
+    """
+    matrix, details = load_answer_matrix(store, assessment, filters)
+    result = screen_answers(matrix, assessment.key.correct, workers=workers, **options)
+    emails = np.array([email.strip().lower() for email in details['email']], dtype=object)
+    first, second = result['first'], result['second']
+    distinct = np.nonzero(emails[first] != emails[second])[0] if len(first) else np.zeros(0, dtype=np.intp)
+    pairs = []
+    for i in distinct[:limit]:
+        a, b = first[i], second[i]
+        pairs.append({
+            'Candidate A': details['name'][a],
+            'Email A': details['email'][a],
+            'Candidate B': details['name'][b],
+            'Email B': details['email'][b],
+            'Cohort A': details['cohort'][a],
+            'Cohort B': details['cohort'][b],
+            'Shared wrong': int(result['shared'][i]),
+            'Expected by chance': round(float(result['expected'][i]), 2),
+            'Chance p': float(result['p_value'][i]),
+            'Wrong-answer overlap': round(float(result['jaccard'][i]), 3),
+            'Identical answers': int(result['identical'][i])
+        })
+    return dict(
+        {name: value for name, value in result.items() if not isinstance(value, np.ndarray)},
+        flagged=int(len(distinct)),
+        pairs=pairs
+    )
+
+
+def lsh_threshold(num_hashes=60, bands=10):
+    """Wrong-answer overlap at which a pair has a 50% chance of being compared under LSH."""
+    rows = num_hashes // bands
+    return math.pow(1 / bands, 1 / rows)
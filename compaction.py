@@ -0,0 +1,324 @@
+"""Compaction of the responses directory and the response store.
+
+Older versions of the app wrote one pretty-printed JSON file per
+submission into ``responses/``, with duplicates from reruns. Compaction
+packs these files into zstd-compressed Parquet segments, one per batch
+(submission day), under ``responses/segments/``. It drops re-saves of the
+same attempt (same email and answers, saved within ``RESAVE_WINDOW_SECONDS``
+of each other) and records every segment in ``manifest.json``, so readers
+open a handful of segments instead of thousands of files. A JSON file is
+deleted only after its segment and the manifest are safely on disk. Files
+still being written (modified in the last ``settle`` seconds) or
+unreadable are left for the next run.
+
+The same pass prunes submitted attempt rows older than the retention period,
+whose answers already live in the submission, and truncates the SQLite
+write-ahead log. Run it from the repository root, or let the app run it in
+the background (``COMPACTION_INTERVAL_SECONDS``):
+
+    python compaction.py --directory responses --retention-days 30
+"""
+import argparse
+import atexit
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_DIR = "segments"
+MANIFEST = "manifest.json"
+LOCK_FILE = ".compaction.lock"
+# A lock older than this belongs to a compaction that died; take it over.
+STALE_LOCK_SECONDS = 3600
+SEGMENT_COLUMNS = ('submission_id', 'timestamp', 'batch', 'name', 'email', 'phone', 'responses')
+# The old app re-saved an attempt on every rerun of the results page, seconds apart. Identical
+# answers further apart than this may be a genuine retake and are kept.
+RESAVE_WINDOW_SECONDS = 120
+
+
+def _legacy_files(directory, settle):
+    cutoff = time.time() - settle
+    try:
+        entries = sorted(os.scandir(directory), key=lambda e: e.name)
+    except FileNotFoundError:
+        return []
+    return [e.name for e in entries if e.is_file() and e.name.endswith(".json") and e.stat().st_mtime < cutoff]
+
+
+def read_legacy(directory, filename):
+    """One legacy submission file as a segment row; raises OSError or ValueError if unreadable."""
+    with open(os.path.join(directory, filename), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("not a submission object")
+    timestamp = str(data.get('timestamp', ''))
+    return {
+        'submission_id': f"json:{filename}",
+        'timestamp': timestamp,
+        'batch': timestamp[:8],
+        'name': data.get('name'),
+        'email': data.get('email', ''),
+        'phone': data.get('phone'),
+        'responses': data.get('responses', {})
+    }
+
+
+def _encode_responses(responses):
+    return json.dumps(responses, ensure_ascii=False, sort_keys=True)
+
+
+def attempt_key(row):
+    """Legacy files carry no attempt id; a re-save of the same attempt has the same email and answers."""
+    return ((row['email'] or '').strip().lower(), _encode_responses(row['responses']))
+
+
+def _saved_at(row):
+    try:
+        return datetime.strptime(row['timestamp'], "%Y%m%d_%H%M%S")
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_resave(times, saved_at):
+    """True if ``saved_at`` is within ``RESAVE_WINDOW_SECONDS`` of one of ``times``."""
+    return saved_at is not None and any(
+        abs((saved_at - other).total_seconds()) <= RESAVE_WINDOW_SECONDS for other in times
+    )
+
+
+def drop_resaves(rows, kept=()):
+    """``rows`` in saved order, without re-saves of each other or of the ``kept`` rows.
+
+    Rows whose timestamp cannot be parsed are always kept.
+    """
+    seen = {}
+    for row in kept:
+        saved_at = _saved_at(row)
+        if saved_at is not None:
+            seen.setdefault(attempt_key(row), []).append(saved_at)
+    fresh = []
+    for row in sorted(rows, key=lambda r: (r['timestamp'], r['submission_id'])):
+        saved_at = _saved_at(row)
+        times = seen.setdefault(attempt_key(row), [])
+        duplicate = _is_resave(times, saved_at)
+        if saved_at is not None:
+            times.append(saved_at)
+        if not duplicate:
+            fresh.append(row)
+    return fresh
+
+
+def load_manifest(directory):
+    path = os.path.join(directory, SEGMENT_DIR, MANIFEST)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'version': 1, 'segments': []}
+
+
+def _write_atomically(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def read_segments(directory, batches=None):
+    """Yield the rows of every segment in the manifest (optionally only ``batches``) as dicts."""
+    manifest = load_manifest(directory)
+    segments = [s for s in manifest['segments'] if batches is None or s['batch'] in batches]
+    if not segments:
+        return
+    import pyarrow.parquet as pq
+
+    for segment in segments:
+        table = pq.read_table(os.path.join(directory, SEGMENT_DIR, segment['file']))
+        for row in table.to_pylist():
+            row['responses'] = json.loads(row['responses'])
+            yield row
+
+
+class _DirectoryLock:
+    """Cross-process lock file, so two workers never compact the same directory at once."""
+
+    def __init__(self, path):
+        self.path = path
+        self.held = False
+
+    def __enter__(self):
+        try:
+            if time.time() - os.path.getmtime(self.path) > STALE_LOCK_SECONDS:
+                os.remove(self.path)
+        except OSError:
+            pass
+        try:
+            os.close(os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            self.held = True
+        except FileExistsError:
+            pass
+        return self
+
+    def __exit__(self, *exc):
+        if self.held:
+            os.remove(self.path)
+
+
+def compact_json_files(directory="responses", settle=60.0):
+    """Pack legacy JSON submission files into per-batch Parquet segments.
+
+    Returns ``{'files': merged, 'rows': written, 'duplicates': dropped,
+    'segments': created, 'skipped': unreadable}``, or None if another process
+    holds the compaction lock.
+    """
+    segment_dir = os.path.join(directory, SEGMENT_DIR)
+    summary = {'files': 0, 'rows': 0, 'duplicates': 0, 'segments': 0, 'skipped': 0}
+    filenames = _legacy_files(directory, settle)
+    if not filenames:
+        return summary
+    os.makedirs(segment_dir, exist_ok=True)
+    with _DirectoryLock(os.path.join(segment_dir, LOCK_FILE)) as lock:
+        if not lock.held:
+            return None
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        by_batch = {}
+        merged = []
+        for filename in _legacy_files(directory, settle):
+            try:
+                row = read_legacy(directory, filename)
+            except (OSError, ValueError) as e:
+                logger.warning("Leaving unreadable response file %s: %s", filename, e)
+                summary['skipped'] += 1
+                continue
+            by_batch.setdefault(row['batch'], []).append(row)
+            merged.append(filename)
+
+        manifest = load_manifest(directory)
+        for batch, rows in sorted(by_batch.items()):
+            fresh = drop_resaves(rows, read_segments(directory, {batch}))
+            summary['duplicates'] += len(rows) - len(fresh)
+            if not fresh:
+                continue
+            existing = sum(1 for s in manifest['segments'] if s['batch'] == batch)
+            name = f"responses-{batch or 'unknown'}-{existing + 1:04d}.parquet"
+            columns = {column: [row[column] for row in fresh] for column in SEGMENT_COLUMNS}
+            columns['responses'] = [_encode_responses(responses) for responses in columns['responses']]
+            table = pa.table(columns)
+            sink = pa.BufferOutputStream()
+            pq.write_table(table, sink, compression='zstd')
+            data = sink.getvalue().to_pybytes()
+            _write_atomically(os.path.join(segment_dir, name), data)
+            manifest['segments'].append({
+                'file': name,
+                'batch': batch,
+                'rows': len(fresh),
+                'first': fresh[0]['timestamp'],
+                'last': fresh[-1]['timestamp'],
+                'sha256': hashlib.sha256(data).hexdigest(),
+                'created_at': datetime.now().isoformat(timespec='seconds')
+            })
+            summary['rows'] += len(fresh)
+            summary['segments'] += 1
+
+        _write_atomically(os.path.join(segment_dir, MANIFEST), json.dumps(manifest, indent=2).encode('utf-8'))
+        for filename in merged:
+            os.remove(os.path.join(directory, filename))
+        summary['files'] = len(merged)
+    return summary
+
+
+def compact(store, directory="responses", retention_days=30, settle=60.0):
+    """One full compaction pass; returns a summary dict."""
+    summary = compact_json_files(directory, settle) or {'locked': True}
+    if retention_days is not None:
+        cutoff = (datetime.now() - timedelta(days=retention_days)).isoformat()
+        summary['attempts_pruned'] = store.prune_attempts(cutoff)
+    summary['wal_truncated'] = store.checkpoint()
+    return summary
+
+
+class Compactor:
+    """Runs ``compact`` every ``interval`` seconds on a daemon thread."""
+
+    def __init__(self, store, directory="responses", interval=3600.0, retention_days=30):
+        self.store = store
+        self.directory = directory
+        self.interval = interval
+        self.retention_days = retention_days
+        self.runs = 0
+        self.files = 0
+        self.attempts_pruned = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="compactor", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def run_once(self):
+        try:
+            summary = compact(self.store, self.directory, self.retention_days)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        with self._lock:
+            self.runs += 1
+            self.files += summary.get('files', 0)
+            self.attempts_pruned += summary.get('attempts_pruned', 0)
+        return summary
+
+    def stats(self):
+        with self._lock:
+            return {'runs': self.runs, 'files': self.files, 'attempts_pruned': self.attempts_pruned,
+                    'failed': self.failed}
+
+    def close(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Compaction failed")
+
+
+def main():
+    from response_store import open_store
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--directory", default="responses", help="responses directory (default: responses)")
+    parser.add_argument("--retention-days", type=int, default=30,
+                        help="prune submitted attempt rows older than this (default: 30)")
+    parser.add_argument("--settle", type=float, default=60.0,
+                        help="leave JSON files modified in the last N seconds (default: 60)")
+    args = parser.parse_args()
+
+    store = open_store()
+    summary = compact(store, args.directory, args.retention_days, args.settle)
+    if summary.get('locked'):
+        print("another compaction is running on this directory; JSON files left alone", file=sys.stderr)
+    else:
+        print(
+            f"merged {summary['files']} JSON files into {summary['segments']} segments "
+            f"({summary['rows']} rows, {summary['duplicates']} duplicate saves dropped, "
+            f"{summary['skipped']} unreadable files left)",
+            file=sys.stderr
+        )
+    print(f"pruned {summary['attempts_pruned']} submitted attempt rows; "
+          f"WAL {'truncated' if summary['wal_truncated'] else 'busy, not truncated'}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import atexit
+import logging
+import threading
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+# Sweeps an expired attempt may fail in before it is set aside as 'failed'.
+MAX_SUBMIT_FAILURES = 3
+
+
+def attempt_deadline(started, minutes):
+    """ISO deadline ``minutes`` after ``started``, or ``None`` for untimed assessments."""
+    if not minutes:
+        return None
+    return (started + timedelta(minutes=minutes)).isoformat(timespec='seconds')
+
+
+def deadline_timestamp(deadline):
+    return datetime.fromisoformat(deadline).timestamp() if deadline else None
+
+
+class DeadlineSweeper:
+    """Submits in-progress attempts whose time ran out with nobody on the page.
+
+    Candidates who are still connected are stopped by the page itself on
+    their next interaction. This thread catches the rest: every ``interval``
+    seconds it looks up attempts more than ``grace`` seconds past their
+    deadline and hands each to ``submit``. Submissions are idempotent, so
+    several workers sweeping the same store cannot submit an attempt twice.
+    An attempt whose submit fails in ``max_failures`` sweeps is marked
+    'failed' (its answers stay on the row), so a few bad rows cannot fill
+    every sweep and starve the rest.
+    """
+
+    def __init__(self, store, submit, interval=30.0, grace=30.0, max_failures=MAX_SUBMIT_FAILURES):
+        self.store = store
+        self.submit = submit
+        self.interval = interval
+        self.grace = grace
+        self.max_failures = max_failures
+        self.sweeps = 0
+        self.submitted = 0
+        self.failed = 0
+        self.given_up = 0
+        self._failures = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="deadline-sweeper", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def sweep(self):
+        cutoff = (datetime.now() - timedelta(seconds=self.grace)).isoformat(timespec='seconds')
+        submitted = failed = given_up = 0
+        for attempt in self.store.expired_attempts(cutoff):
+            attempt_id = attempt['attempt_id']
+            try:
+                self.submit(attempt)
+                submitted += 1
+                self._failures.pop(attempt_id, None)
+            except Exception:
+                failed += 1
+                logger.exception("Auto-submit of expired attempt %s failed", attempt_id)
+                self._failures[attempt_id] = self._failures.get(attempt_id, 0) + 1
+                if self._failures[attempt_id] >= self.max_failures:
+                    self.store.set_attempt_status(attempt_id, 'failed')
+                    del self._failures[attempt_id]
+                    given_up += 1
+                    logger.error("Gave up on expired attempt %s after %d failed submits",
+                                 attempt_id, self.max_failures)
+        with self._lock:
+            self.sweeps += 1
+            self.submitted += submitted
+            self.failed += failed
+            self.given_up += given_up
+        return submitted
+
+    def stats(self):
+        with self._lock:
+            return {'sweeps': self.sweeps, 'submitted': self.submitted, 'failed': self.failed,
+                    'given_up': self.given_up}
+
+    def close(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception("Deadline sweep failed")
@@ -0,0 +1,28 @@
+import threading
+import time
+from collections import deque
+
+
+class EventBus:
+    """In-process feed of recent attempt events for the live dashboard.
+
+    Only the most recent ``maxlen`` events are retained. Events are not
+    shared between workers; dashboard counts come from the response store.
+    """
+
+    def __init__(self, maxlen=5000):
+        self._events = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def publish(self, kind, **data):
+        event = dict(data, kind=kind, at=time.time())
+        with self._lock:
+            self._events.append(event)
+        return event
+
+    def recent(self, kind=None, limit=10):
+        with self._lock:
+            events = list(self._events)
+        if kind is not None:
+            events = [event for event in events if event['kind'] == kind]
+        return events[-limit:][::-1]
@@ -0,0 +1,151 @@
+"""Exports of stored submissions as CSV, Parquet or Excel.
+
+The dashboard offers exports up to ``EXPORT_MAX_ROWS`` rows. Larger ones
+are written straight to disk from the repository root:
+
+    python export.py day1 students.csv --format CSV --cohort mar24
+"""
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from scoring import OPTIONS, encode_responses, score_matrix
+
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+EXPORT_CHUNK_SIZE = 5000
+
+_LETTERS = np.array([''] + list(OPTIONS), dtype=object)
+
+
+def export_frame(rows, assessment):
+    key = assessment.key
+    matrix = encode_responses([row.get('responses', {}) for row in rows], key)
+    result = score_matrix(matrix, key)
+    frame = pd.DataFrame({
+        'Name': [row.get('name') or 'N/A' for row in rows],
+        'Email': [row.get('email') or 'N/A' for row in rows],
+        'Phone': [row.get('phone') or 'N/A' for row in rows],
+        'Timestamp': [row.get('timestamp', '') for row in rows],
+        'Batch': [row.get('batch', '') for row in rows],
+        'Cohort': [row.get('cohort', '') for row in rows],
+        'Attempt': [row.get('attempt_number', 1) for row in rows],
+        'Score': pd.Series(result.scores).astype(str) + f"/{key.paper_size}",
+        'Percentage': pd.Series(result.percentages).round(1).astype(str) + "%",
+        'Status': np.where(result.scores >= assessment.pass_score, 'PASSED', 'FAILED')
+    })
+    answers = _LETTERS[matrix]
+    for i, q_num in enumerate(key.question_ids):
+        frame[f"Q{q_num}"] = answers[:, i]
+    return frame
+
+
+def write_csv(frames, out):
+    header = True
+    for frame in frames:
+        out.write(frame.to_csv(index=False, header=header).encode('utf-8'))
+        header = False
+
+
+def write_parquet(frames, out):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for frame in frames:
+            if writer is None:
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                writer = pq.ParquetWriter(out, table.schema, compression='zstd')
+            else:
+                table = pa.Table.from_pandas(frame, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_excel(frames, out):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Students")
+    header = True
+    for frame in frames:
+        if header:
+            sheet.append(list(frame.columns))
+            header = False
+        for row in frame.itertuples(index=False, name=None):
+            sheet.append(list(row))
+    workbook.save(out)
+
+
+WRITERS = {
+    'CSV': write_csv,
+    'Parquet': write_parquet,
+    'Excel': write_excel,
+}
+
+
+def iter_export_frames(store, assessment, chunk_size=EXPORT_CHUNK_SIZE, filters=None):
+    empty = True
+    for rows in store.iter_batches(chunk_size, assessment_id=assessment.assessment_id, **(filters or {})):
+        empty = False
+        yield export_frame(rows, assessment)
+    if empty:
+        yield export_frame([], assessment)
+
+
+def write_export(store, assessment, fmt, out, chunk_size=EXPORT_CHUNK_SIZE, filters=None):
+    """Write an assessment's stored submissions to the binary file ``out`` in the given format.
+
+    ``filters`` limits the export to matching submissions, as on the dashboard.
+    Rows are read and converted ``chunk_size`` at a time, so memory use does
+    not grow with the cohort.
+    """
+    WRITERS[fmt](iter_export_frames(store, assessment, chunk_size, filters), out)
+
+
+def export_responses(store, assessment, fmt='CSV', chunk_size=EXPORT_CHUNK_SIZE, filters=None):
+    """The export as bytes, for ``st.download_button``.
+
+    The file is built on disk, but Streamlit's download button serves it
+    from memory, so the dashboard only offers exports of up to
+    ``EXPORT_MAX_ROWS`` rows. Larger ones go through the command line.
+    """
+    with tempfile.TemporaryFile() as out:
+        write_export(store, assessment, fmt, out, chunk_size, filters)
+        out.seek(0)
+        return out.read()
+
+
+def main():
+    from question_bank import QUESTION_BANK_DIR, load_question_bank
+    from response_store import open_store
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("assessment", help="assessment id")
+    parser.add_argument("output", help="file to write")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default='CSV')
+    parser.add_argument("--cohort", help="only this cohort")
+    parser.add_argument("--since", help="only submissions from this date on (YYYYMMDD)")
+    parser.add_argument("--until", help="only submissions before this date (YYYYMMDD)")
+    args = parser.parse_args()
+
+    bank = load_question_bank(QUESTION_BANK_DIR)
+    if args.assessment not in bank.assessments:
+        parser.error(f"unknown assessment {args.assessment!r}; choose from {', '.join(bank.assessments)}")
+    filters = {name: value for name, value in (('cohort', args.cohort), ('since', args.since), ('until', args.until))
+               if value is not None}
+    with open(args.output, 'wb') as out:
+        write_export(open_store(), bank.get(args.assessment), args.format, out, filters=filters)
+
+
+if __name__ == "__main__":
+    main()
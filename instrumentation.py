@@ -0,0 +1,193 @@
+import bisect
+import cProfile
+import functools
+import heapq
+import io
+import itertools
+import os
+import pstats
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Upper bounds in seconds, Prometheus style; the last bucket is +Inf.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with count, sum and max."""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = BUCKETS[i - 1] if i else 0.0
+                upper = BUCKETS[i] if i < len(BUCKETS) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+
+class Metrics:
+    """Process-wide timing spans aggregated into one histogram per name."""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._written_at = 0.0
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def span(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def timed(self, name):
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: {
+                    'count': h.count,
+                    'total': h.total,
+                    'mean': h.total / h.count if h.count else 0.0,
+                    'p50': h.quantile(0.50),
+                    'p95': h.quantile(0.95),
+                    'p99': h.quantile(0.99),
+                    'max': h.max
+                }
+                for name, h in sorted(self._histograms.items())
+            }
+
+    def prometheus_text(self, metric="assessment_span_seconds"):
+        lines = [
+            f"# HELP {metric} Time spent in instrumented app code paths.",
+            f"# TYPE {metric} histogram"
+        ]
+        with self._lock:
+            for name, h in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, n in zip(BUCKETS, h.counts):
+                    cumulative += n
+                    lines.append(f'{metric}_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{span="{name}",le="+Inf"}} {h.count}')
+                lines.append(f'{metric}_sum{{span="{name}"}} {h.total:.6f}')
+                lines.append(f'{metric}_count{{span="{name}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path, interval=15.0):
+        """Rewrite ``path`` atomically, at most once per ``interval`` seconds.
+
+        The file is in the text exposition format, ready for node_exporter's
+        textfile collector or any scraper that reads a file.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._written_at < interval:
+                return False
+            self._written_at = now
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".metrics-")
+        with os.fdopen(fd, "w") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+        return True
+
+
+class RerunProfiler:
+    """Opt-in cProfile capture that keeps only the ``keep`` slowest reruns.
+
+    One rerun is profiled at a time; reruns that start while another is
+    being profiled run unprofiled rather than waiting.
+    """
+
+    def __init__(self, keep=0, lines=30):
+        self.keep = keep
+        self.lines = lines
+        self._slowest = []
+        self._busy = threading.Lock()
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+
+    @property
+    def enabled(self):
+        return self.keep > 0
+
+    @contextmanager
+    def capture(self, label):
+        if not self.enabled or not self._busy.acquire(blocking=False):
+            yield
+            return
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            profile.enable()
+            yield
+        finally:
+            profile.disable()
+            self._busy.release()
+            self._record(label, time.perf_counter() - started, profile)
+
+    def _record(self, label, elapsed, profile):
+        with self._lock:
+            if len(self._slowest) >= self.keep and elapsed <= self._slowest[0][0]:
+                return
+        out = io.StringIO()
+        pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(self.lines)
+        entry = (elapsed, next(self._sequence), {
+            'label': label,
+            'seconds': elapsed,
+            'captured_at': datetime.now().isoformat(timespec="seconds"),
+            'stats': out.getvalue()
+        })
+        with self._lock:
+            if len(self._slowest) < self.keep:
+                heapq.heappush(self._slowest, entry)
+            else:
+                heapq.heappushpop(self._slowest, entry)
+
+    def slowest(self):
+        with self._lock:
+            return [record for _, _, record in sorted(self._slowest, reverse=True)]
+
+
+metrics = Metrics()
+profiler = RerunProfiler(int(os.environ.get("PROFILE_SLOW_RERUNS", "0")))
@@ -0,0 +1,209 @@
+"""Two-parameter logistic (2PL) item response theory: offline calibration and runtime lookups.
+
+Calibration fits each item's discrimination ``a`` and difficulty ``b`` to
+the stored submissions by marginal maximum likelihood (EM over a fixed
+quadrature grid), and saves them in the response store for the current
+answer key. Run it after a sitting, from the repository root:
+
+    python irt.py day1
+
+At runtime an ``ItemTable`` holds, for a grid of ability values, every
+item's log-probabilities and the items ordered by Fisher information, so
+choosing the next adaptive question and updating the ability estimate are
+table lookups.
+"""
+import argparse
+import hashlib
+import json
+import sys
+
+import numpy as np
+
+from scoring import encode_responses
+
+GRID = np.linspace(-4.0, 4.0, 81)
+QUADRATURE = np.linspace(-4.0, 4.0, 41)
+CALIBRATION_CHUNK_SIZE = 20000
+# Items seen by fewer candidates than this are left out of the table.
+MIN_RESPONSES = 30
+
+
+def calibration_key(assessment):
+    """Short hash of the correct answers; a calibration only applies to the key it was fitted with."""
+    correct = {str(q.number): q.correct for q in assessment.questions}
+    return hashlib.sha256(json.dumps(correct, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+
+def _log_normal_prior(points):
+    prior = -0.5 * points ** 2
+    return prior - np.logaddexp.reduce(prior)
+
+
+def _log_probabilities(a, b, points):
+    z = a[None, :] * (points[:, None] - b[None, :])
+    return -np.logaddexp(0.0, -z), -np.logaddexp(0.0, z)
+
+
+def fit_2pl(correct, presented, weights=None, max_iterations=200, tolerance=1e-4):
+    """Fit 2PL parameters to boolean ``(patterns, items)`` matrices.
+
+    ``presented`` marks which items each row saw; ``weights`` counts how many
+    candidates share each row, so identical answer patterns are fitted once.
+    Weak priors (a ~ N(1, 1), b ~ N(0, 2)) keep items everyone gets right or
+    wrong finite. Returns ``(a, b, iterations)``.
+    """
+    x = correct.astype(np.float64)
+    m = presented.astype(np.float64)
+    weights = np.ones(len(x)) if weights is None else np.asarray(weights, dtype=np.float64)
+    log_prior = _log_normal_prior(QUADRATURE)
+
+    seen = np.maximum(weights @ m, 1.0)
+    p = np.clip((weights @ x) / seen, 0.02, 0.98)
+    a = np.ones(x.shape[1])
+    b = np.log((1 - p) / p) / 1.7
+
+    for iteration in range(1, max_iterations + 1):
+        log_p, log_q = _log_probabilities(a, b, QUADRATURE)
+        log_post = x @ log_p.T + (m - x) @ log_q.T + log_prior
+        log_post -= np.logaddexp.reduce(log_post, axis=1, keepdims=True)
+        posterior = np.exp(log_post) * weights[:, None]
+        r = x.T @ posterior
+        n = m.T @ posterior
+
+        # One Fisher-scoring step per EM cycle is enough; the E-step dominates.
+        prob = np.exp(log_p).T
+        residual = r - n * prob
+        info = n * prob * (1 - prob)
+        d = QUADRATURE[None, :] - b[:, None]
+        grad_a = (residual * d).sum(axis=1) - (a - 1.0)
+        grad_b = -a * residual.sum(axis=1) - b / 4.0
+        i_aa = (info * d * d).sum(axis=1) + 1.0
+        i_bb = a * a * info.sum(axis=1) + 0.25
+        i_ab = -a * (info * d).sum(axis=1)
+        det = np.maximum(i_aa * i_bb - i_ab * i_ab, 1e-12)
+        step_a = (i_bb * grad_a - i_ab * grad_b) / det
+        step_b = (i_aa * grad_b - i_ab * grad_a) / det
+        new_a = np.clip(a + step_a, 0.2, 4.0)
+        new_b = np.clip(b + step_b, -5.0, 5.0)
+        change = max(np.abs(new_a - a).max(), np.abs(new_b - b).max())
+        a, b = new_a, new_b
+        if change < tolerance:
+            break
+    return a, b, iteration
+
+
+def calibrate(store, assessment, chunk_size=CALIBRATION_CHUNK_SIZE):
+    """Fit 2PL parameters for an assessment from all of its stored submissions.
+
+    Returns ``{'a': {number: a}, 'b': {number: b}, 'candidates': n, ...}``;
+    items with fewer than ``MIN_RESPONSES`` answers are omitted.
+    """
+    key = assessment.key
+    patterns = {}
+    candidates = 0
+    for rows in store.iter_batches(chunk_size, assessment_id=assessment.assessment_id):
+        matrix = encode_responses([row.get('responses', {}) for row in rows], key)
+        unique, counts = np.unique(matrix, axis=0, return_counts=True)
+        for row, count in zip(map(bytes, unique), counts.tolist()):
+            patterns[row] = patterns.get(row, 0) + count
+        candidates += len(rows)
+    if not candidates:
+        raise ValueError(f"no submissions stored for {assessment.assessment_id}")
+
+    matrix = np.frombuffer(b"".join(patterns), dtype=np.uint8).reshape(len(patterns), key.num_questions)
+    weights = np.fromiter(patterns.values(), dtype=np.float64, count=len(patterns))
+    presented = matrix != 0
+    a, b, iterations = fit_2pl(matrix == key.correct, presented, weights)
+    responses = weights @ presented
+    keep = responses >= MIN_RESPONSES
+    return {
+        'a': {str(q_num): round(float(a[i]), 4) for i, q_num in enumerate(key.question_ids) if keep[i]},
+        'b': {str(q_num): round(float(b[i]), 4) for i, q_num in enumerate(key.question_ids) if keep[i]},
+        'candidates': candidates,
+        'patterns': len(patterns),
+        'iterations': iterations
+    }
+
+
+class ItemTable:
+    """Precomputed 2PL lookups over an ability grid.
+
+    ``best[g]`` lists item columns from most to least informative at grid
+    point ``g``, so the next adaptive item is the first one in that row the
+    candidate has not seen. Ability is the expected a posteriori (EAP)
+    estimate under a standard normal prior.
+    """
+
+    def __init__(self, question_ids, a, b):
+        self.question_ids = tuple(question_ids)
+        self.column = {q_num: i for i, q_num in enumerate(self.question_ids)}
+        self.a = np.asarray(a, dtype=np.float64)
+        self.b = np.asarray(b, dtype=np.float64)
+        self.log_p, self.log_q = _log_probabilities(self.a, self.b, GRID)
+        p = np.exp(self.log_p)
+        self.information = self.a[None, :] ** 2 * p * (1 - p)
+        self.best = np.argsort(-self.information, axis=1, kind='stable')
+        self.log_prior = _log_normal_prior(GRID)
+        self._step = GRID[1] - GRID[0]
+
+    @classmethod
+    def from_parameters(cls, parameters):
+        numbers = sorted(int(q_num) for q_num in parameters['a'])
+        return cls(numbers, [parameters['a'][str(n)] for n in numbers], [parameters['b'][str(n)] for n in numbers])
+
+    def __contains__(self, q_num):
+        return q_num in self.column
+
+    def estimate(self, q_nums, right):
+        """EAP ability and its posterior SD after answering ``q_nums`` (``right`` flags)."""
+        log_post = self.log_prior.copy()
+        for q_num, ok in zip(q_nums, right):
+            j = self.column.get(q_num)
+            if j is not None:
+                log_post += self.log_p[:, j] if ok else self.log_q[:, j]
+        post = np.exp(log_post - log_post.max())
+        post /= post.sum()
+        theta = float(post @ GRID)
+        return theta, float(np.sqrt(max(post @ (GRID - theta) ** 2, 0.0)))
+
+    def next_item(self, theta, administered):
+        """Most informative question number at ``theta`` not in ``administered``; None if none left."""
+        g = min(max(int(round((theta - GRID[0]) / self._step)), 0), len(GRID) - 1)
+        for j in self.best[g]:
+            q_num = self.question_ids[j]
+            if q_num not in administered:
+                return q_num
+        return None
+
+
+def main():
+    from question_bank import QUESTION_BANK_DIR, load_question_bank
+    from response_store import open_store
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("assessment", nargs="?", help="assessment id (default: the bank's default assessment)")
+    args = parser.parse_args()
+
+    bank = load_question_bank(QUESTION_BANK_DIR)
+    if args.assessment and args.assessment not in bank.assessments:
+        parser.error(f"unknown assessment {args.assessment!r}; choose from {', '.join(bank.assessments)}")
+    assessment = bank.get(args.assessment)
+    store = open_store()
+    try:
+        parameters = calibrate(store, assessment)
+    except ValueError as e:
+        parser.error(str(e))
+    version = calibration_key(assessment)
+    store.save_item_parameters(assessment.assessment_id, version, parameters)
+    print(
+        f"{assessment.assessment_id}: calibrated {len(parameters['a'])} of {assessment.num_questions} items "
+        f"from {parameters['candidates']} submissions ({parameters['patterns']} distinct patterns, "
+        f"{parameters['iterations']} EM iterations) for key {version}",
+        file=sys.stderr
+    )
+    for q_num in sorted(parameters['a'], key=int):
+        print(f"Q{q_num}\ta={parameters['a'][q_num]:.2f}\tb={parameters['b'][q_num]:+.2f}")
+
+
+if __name__ == "__main__":
+    main()
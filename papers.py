@@ -0,0 +1,208 @@
+import hashlib
+import random
+from dataclasses import dataclass, field
+from types import MappingProxyType
+
+import numpy as np
+
+from scoring import OPTIONS
+
+# Letters shown next to options on screen, whatever option they stand for.
+DISPLAY_LETTERS = tuple(option.upper() for option in OPTIONS)
+STRATIFY_FIELDS = ('topic', 'difficulty')
+
+
+@dataclass(frozen=True, slots=True)
+class PaperSpec:
+    """How candidate papers are drawn from an assessment's question pool.
+
+    ``strata`` pairs each (topic, difficulty, ...) stratum with its question
+    numbers, and ``quotas`` holds how many questions each stratum gives a
+    paper. Both are fixed when the bank loads, so generating a paper is one
+    ``sample`` per stratum.
+    """
+    size: int
+    shuffle_questions: bool
+    shuffle_options: bool
+    stratify_by: tuple
+    strata: tuple = field(repr=False)
+    quotas: tuple = field(repr=False)
+
+
+@dataclass(frozen=True, slots=True)
+class Paper:
+    """The questions one candidate sees, in order, with their option order.
+
+    ``option_orders[i]`` lists the canonical letters of question ``i`` in the
+    order they are displayed, and ``correct`` holds the canonical answer codes
+    by position, so scoring a paper never goes back to the pool.
+    """
+    assessment_id: str
+    seed: int
+    questions: tuple = field(repr=False)
+    question_ids: tuple
+    option_orders: tuple = field(repr=False)
+    column: MappingProxyType = field(repr=False, compare=False)
+    correct: np.ndarray = field(repr=False, compare=False)
+    key: object = field(repr=False, compare=False)
+    adaptive: bool = False
+
+    @property
+    def size(self):
+        return len(self.question_ids)
+
+    def position(self, q_num):
+        """1-based number of a question on this paper."""
+        return self.column[q_num] + 1
+
+    def display_letter(self, q_num, answer):
+        """Letter the candidate saw for canonical ``answer`` to ``q_num``."""
+        return DISPLAY_LETTERS[self.option_orders[self.column[q_num]].index(answer)]
+
+
+@dataclass(frozen=True, slots=True)
+class AdaptiveSpec:
+    """When a computerized adaptive paper stops.
+
+    A candidate answers at least ``min_items`` and at most ``max_items``
+    questions; in between, the paper ends once the standard error of their
+    ability estimate falls to ``target_se``.
+    """
+    max_items: int
+    min_items: int
+    target_se: float
+
+
+def allocate(sizes, total):
+    """Split ``total`` across strata in proportion to ``sizes`` (largest remainder)."""
+    pool = sum(sizes)
+    exact = [size * total / pool for size in sizes]
+    quotas = [int(x) for x in exact]
+    by_remainder = sorted(range(len(sizes)), key=lambda i: exact[i] - quotas[i], reverse=True)
+    for i in by_remainder[:total - sum(quotas)]:
+        quotas[i] += 1
+    return tuple(quotas)
+
+
+def build_paper_spec(data, questions):
+    size = int(data.get('size', len(questions)))
+    if not 0 < size <= len(questions):
+        raise ValueError(f"paper size must be between 1 and {len(questions)}")
+    stratify_by = tuple(data.get('stratify_by', STRATIFY_FIELDS))
+    unknown = set(stratify_by) - set(STRATIFY_FIELDS)
+    if unknown:
+        raise ValueError(f"cannot stratify papers by {', '.join(sorted(unknown))}")
+
+    strata = {}
+    for q in questions:
+        strata.setdefault(tuple(getattr(q, name) for name in stratify_by), []).append(q.number)
+    strata = tuple((stratum, tuple(numbers)) for stratum, numbers in strata.items())
+    return PaperSpec(
+        size=size,
+        shuffle_questions=bool(data.get('shuffle_questions', True)),
+        shuffle_options=bool(data.get('shuffle_options', True)),
+        stratify_by=stratify_by,
+        strata=strata,
+        quotas=allocate([len(numbers) for _, numbers in strata], size)
+    )
+
+
+def build_adaptive_spec(data, questions):
+    max_items = int(data.get('max_items', len(questions)))
+    if not 0 < max_items <= len(questions):
+        raise ValueError(f"adaptive max_items must be between 1 and {len(questions)}")
+    # Fixed length unless asked otherwise, so raw scores stay out of the same total.
+    min_items = int(data.get('min_items', max_items))
+    if not 0 < min_items <= max_items:
+        raise ValueError("adaptive min_items must be between 1 and max_items")
+    target_se = float(data.get('target_se', 0.0))
+    if target_se < 0:
+        raise ValueError("adaptive target_se cannot be negative")
+    return AdaptiveSpec(max_items=max_items, min_items=min_items, target_se=target_se)
+
+
+def make_paper(assessment_id, key, by_number, question_ids, option_orders, seed=0, adaptive=False):
+    questions = tuple(by_number[n] for n in question_ids)
+    return Paper(
+        assessment_id=assessment_id,
+        seed=seed,
+        questions=questions,
+        question_ids=tuple(question_ids),
+        option_orders=tuple(option_orders),
+        column=MappingProxyType({n: i for i, n in enumerate(question_ids)}),
+        correct=np.array([OPTIONS.index(q.correct) + 1 for q in questions], dtype=np.uint8),
+        key=key,
+        adaptive=adaptive
+    )
+
+
+def paper_seed(assessment_id, email, attempt_id):
+    digest = hashlib.sha256(f"{assessment_id}|{email.strip().lower()}|{attempt_id}".encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+def generate_paper(assessment, email, attempt_id):
+    """The candidate's paper for this attempt, regenerated identically on every call.
+
+    Assessments without a ``paper`` section give everyone the same shared
+    paper: all questions in number order, options unshuffled.
+    """
+    spec = assessment.paper_spec
+    if spec is None:
+        return assessment.fixed_paper
+    seed = paper_seed(assessment.assessment_id, email, attempt_id)
+    rng = random.Random(seed)
+    chosen = []
+    for (_, numbers), quota in zip(spec.strata, spec.quotas):
+        chosen.extend(rng.sample(numbers, quota))
+    if spec.shuffle_questions:
+        rng.shuffle(chosen)
+    else:
+        chosen.sort()
+    orders = []
+    for _ in chosen:
+        order = list(OPTIONS)
+        if spec.shuffle_options:
+            rng.shuffle(order)
+        orders.append(tuple(order))
+    return make_paper(assessment.assessment_id, assessment.key, assessment.by_number, chosen, orders, seed)
+
+
+def next_adaptive_paper(assessment, table, paper, codes):
+    """``(paper, finished)``: ``paper`` extended by its next question, or unchanged once it should stop.
+
+    Every question on ``paper`` must be answered in ``codes``. The next one is
+    the most informative at the candidate's current ability estimate, looked
+    up in ``table`` (an ``irt.ItemTable``).
+    """
+    spec = assessment.adaptive
+    administered = paper.question_ids
+    theta, se = table.estimate(administered, [code == correct for code, correct in zip(codes, paper.correct)])
+    answered = len(administered)
+    if answered >= spec.max_items or (answered >= spec.min_items and se <= spec.target_se):
+        return paper, True
+    q_num = table.next_item(theta, set(administered))
+    if q_num is None:
+        return paper, True
+    order = list(OPTIONS)
+    if assessment.paper_spec.shuffle_options:
+        random.Random(paper.seed ^ q_num).shuffle(order)
+    paper = make_paper(assessment.assessment_id, assessment.key, assessment.by_number, administered + (q_num,),
+                       paper.option_orders + (tuple(order),), paper.seed, adaptive=True)
+    return paper, False
+
+
+def adaptive_paper(assessment, table, email, attempt_id, codes=b""):
+    """Replay a candidate's adaptive paper from the answers given so far.
+
+    Item selection depends only on the calibration and the answers, so the
+    same ``codes`` always rebuild the same paper. Returns ``(paper,
+    finished)``; an unfinished paper ends with the question now awaiting an
+    answer.
+    """
+    seed = paper_seed(assessment.assessment_id, email, attempt_id)
+    paper = make_paper(assessment.assessment_id, assessment.key, assessment.by_number, (), (), seed, adaptive=True)
+    while True:
+        paper, finished = next_adaptive_paper(assessment, table, paper, codes)
+        if finished or paper.size > len(codes) or not codes[paper.size - 1]:
+            return paper, finished
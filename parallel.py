@@ -0,0 +1,22 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+def map_chunks(function, tasks, workers=1):
+    """Yield ``function(task)`` for each task in order, using ``workers`` processes.
+
+    Only ``2 * workers`` tasks are in flight at once, so a long stream of
+    chunks is never materialised in memory. With one worker everything runs
+    inline, which avoids pickling on single-CPU hosts.
+    """
+    if workers <= 1:
+        yield from map(function, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(function, task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
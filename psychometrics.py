@@ -0,0 +1,157 @@
+import numpy as np
+
+from scoring import OPTIONS
+
+# Codes 0..4: unanswered, then a..d.
+NUM_CODES = len(OPTIONS) + 1
+
+
+class ItemStatistics:
+    """Classical item analysis kept as running sufficient statistics.
+
+    ``add`` folds in a batch of the uint8 code matrix together with the
+    batch's total scores. Only sums and counts are stored, so difficulty,
+    point-biserial discrimination, distractor frequencies and KR-20 can be
+    recomputed at any time without revisiting earlier submissions.
+
+    When papers are drawn from a larger pool or adapt to the candidate, an
+    item is only scored against the candidates whose paper carried it (those
+    who answered it), and KR-20 is left undefined because no two candidates
+    sat the same test.
+    """
+
+    def __init__(self, key):
+        q = key.num_questions
+        self.key = key
+        self.sampled = key.sampled
+        self.num_students = 0
+        self.score_sum = 0
+        self.score_sq_sum = 0
+        self.item_correct = np.zeros(q, dtype=np.int64)
+        self.item_score_sum = np.zeros(q, dtype=np.int64)
+        self.item_presented = np.zeros(q, dtype=np.int64)
+        self.presented_score_sum = np.zeros(q, dtype=np.int64)
+        self.presented_score_sq_sum = np.zeros(q, dtype=np.int64)
+        self.option_counts = np.zeros((q, NUM_CODES), dtype=np.int64)
+        self.option_score_sum = np.zeros((q, NUM_CODES), dtype=np.int64)
+
+    def add(self, matrix, scores):
+        n, q = matrix.shape
+        if n == 0:
+            return
+        scores = scores.astype(np.int64)
+        correct = (matrix == self.key.correct).astype(np.int64)
+        self.num_students += n
+        self.score_sum += int(scores.sum())
+        self.score_sq_sum += int(scores @ scores)
+        self.item_correct += correct.sum(axis=0)
+        self.item_score_sum += scores @ correct
+        if self.sampled:
+            presented = (matrix != 0).astype(np.int64)
+            self.item_presented += presented.sum(axis=0)
+            self.presented_score_sum += scores @ presented
+            self.presented_score_sq_sum += (scores * scores) @ presented
+
+        cells = (np.arange(q, dtype=np.intp) * NUM_CODES + matrix).ravel()
+        size = q * NUM_CODES
+        self.option_counts += np.bincount(cells, minlength=size).reshape(q, NUM_CODES)
+        self.option_score_sum += np.bincount(
+            cells, weights=np.repeat(scores, q), minlength=size
+        ).astype(np.int64).reshape(q, NUM_CODES)
+
+    def _moments(self):
+        n = max(self.num_students, 1)
+        mean = self.score_sum / n
+        variance = self.score_sq_sum / n - mean * mean
+        return n, mean, max(variance, 0.0)
+
+    def _item_moments(self):
+        """Per-item ``(n, mean, variance)`` of total scores over the candidates who saw the item."""
+        if not self.sampled:
+            n, mean, variance = self._moments()
+            return n, np.full(self.key.num_questions, mean), np.full(self.key.num_questions, variance)
+        n = np.maximum(self.item_presented, 1)
+        mean = self.presented_score_sum / n
+        variance = np.maximum(self.presented_score_sq_sum / n - mean * mean, 0.0)
+        return n, mean, variance
+
+    def difficulty(self):
+        """Proportion of candidates answering each item correctly (p-value)."""
+        if self.sampled:
+            return self.item_correct / np.maximum(self.item_presented, 1)
+        return self.item_correct / max(self.num_students, 1)
+
+    def point_biserial(self, corrected=True):
+        """Item-total correlation; ``corrected`` excludes the item from the total."""
+        n, mean, variance = self._item_moments()
+        p = self.difficulty()
+        item_variance = p * (1 - p)
+        covariance = self.item_score_sum / n - p * mean
+        total_variance = variance
+        if corrected:
+            covariance = covariance - item_variance
+            total_variance = variance - 2 * (covariance + item_variance) + item_variance
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r = covariance / np.sqrt(item_variance * total_variance)
+        return np.where(np.isfinite(r), r, np.nan)
+
+    def option_frequencies(self):
+        """Share of candidates choosing each code per item, shape ``(questions, 5)``."""
+        if self.sampled:
+            # A blank on a pooled paper means the item was not on it, not a skipped answer.
+            frequencies = self.option_counts / np.maximum(self.item_presented, 1)[:, None]
+            frequencies[:, 0] = 0.0
+            return frequencies
+        return self.option_counts / max(self.num_students, 1)
+
+    def option_mean_scores(self):
+        """Mean total score of the candidates choosing each code per item."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.option_counts > 0, self.option_score_sum / self.option_counts, np.nan)
+
+    def kr20(self):
+        """KR-20 reliability, equal to Cronbach's alpha for right/wrong items; NaN if undefined."""
+        k = self.key.num_questions
+        _, _, variance = self._moments()
+        if self.sampled or k < 2 or self.num_students < 2 or variance == 0:
+            return float('nan')
+        p = self.difficulty()
+        return float(k / (k - 1) * (1 - (p * (1 - p)).sum() / variance))
+
+    def reliability(self):
+        _, mean, variance = self._moments()
+        kr20 = self.kr20()
+        sd = variance ** 0.5
+        defined = 0 <= kr20 <= 1
+        return {
+            'students': self.num_students,
+            'mean': mean,
+            'sd': sd,
+            'kr20': kr20 if kr20 == kr20 else None,
+            'sem': sd * (1 - kr20) ** 0.5 if defined else None
+        }
+
+    def flags(self, p_low=0.2, p_high=0.9, r_min=0.2):
+        """Short review notes per item: too hard, too easy, weak or misleading."""
+        p = self.difficulty()
+        r = self.point_biserial()
+        means = self.option_mean_scores()
+        correct = self.key.correct.astype(np.intp)
+        key_mean = means[np.arange(len(correct)), correct]
+        notes = []
+        for j in range(self.key.num_questions):
+            item = []
+            if p[j] < p_low:
+                item.append("hard")
+            if p[j] > p_high:
+                item.append("easy")
+            if np.isfinite(r[j]) and r[j] < r_min:
+                item.append("negative discrimination" if r[j] < 0 else "weak discrimination")
+            distractors = [
+                OPTIONS[code - 1] for code in range(1, NUM_CODES)
+                if code != correct[j] and means[j, code] > key_mean[j]
+            ]
+            if distractors:
+                item.append(f"distractor {'/'.join(d.upper() for d in distractors)} draws stronger candidates")
+            notes.append("; ".join(item))
+        return notes
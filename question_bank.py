@@ -0,0 +1,225 @@
+import json
+import math
+import os
+from dataclasses import dataclass, field
+from types import MappingProxyType
+
+from papers import build_adaptive_spec, build_paper_spec, make_paper
+from scoring import OPTIONS, AnswerKey
+
+QUESTION_BANK_DIR = os.environ.get("QUESTION_BANK_DIR", "assessments")
+BANK_EXTENSIONS = (".json", ".yaml", ".yml")
+
+
+class QuestionBankError(ValueError):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class Question:
+    number: int
+    question: str
+    options: MappingProxyType
+    correct: str
+    topic: str
+    difficulty: str
+
+
+@dataclass(frozen=True, slots=True)
+class Assessment:
+    assessment_id: str
+    title: str
+    description: str
+    pass_score: int
+    time_limit_minutes: int
+    topics_covered: tuple
+    questions: tuple
+    by_number: MappingProxyType = field(repr=False)
+    topic_index: MappingProxyType = field(repr=False)
+    key: AnswerKey = field(repr=False, compare=False)
+    paper_spec: object = field(repr=False)
+    fixed_paper: object = field(repr=False, compare=False)
+    adaptive: object = field(default=None, repr=False)
+
+    @property
+    def num_questions(self):
+        return len(self.questions)
+
+    @property
+    def paper_size(self):
+        """Questions on each candidate's paper; the whole pool unless a paper spec says otherwise."""
+        return self.paper_spec.size if self.paper_spec else self.num_questions
+
+    @property
+    def pass_percentage(self):
+        return self.pass_score * 100.0 / self.paper_size if self.questions else 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class QuestionBank:
+    assessments: MappingProxyType
+    default_id: str
+    signature: tuple
+
+    def get(self, assessment_id=None):
+        return self.assessments.get(assessment_id or self.default_id) or self.assessments[self.default_id]
+
+
+def paginate_questions(paper, per_section):
+    """Split a candidate's paper into ``(title, questions)`` sections.
+
+    ``per_section`` is either a page size or ``"topic"`` for one section per
+    topic, in the order topics first appear on the paper.
+    """
+    if per_section == "topic":
+        by_topic = {}
+        for q in paper.questions:
+            by_topic.setdefault(q.topic, []).append(q)
+        return [(topic, tuple(questions)) for topic, questions in by_topic.items()]
+    per_section = max(int(per_section), 1)
+    questions = paper.questions
+    sections = []
+    for start in range(0, len(questions), per_section):
+        chunk = questions[start:start + per_section]
+        sections.append((f"Questions {start + 1}-{start + len(chunk)}", chunk))
+    return sections
+
+
+def _require(data, name, source):
+    if name not in data:
+        raise QuestionBankError(f"{source}: missing required field '{name}'")
+    return data[name]
+
+
+def _integer(value, name, source):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise QuestionBankError(f"{source}: '{name}' must be a whole number, not {value!r}")
+
+
+def _build_question(data, source):
+    number = _integer(_require(data, 'number', source), 'number', source)
+    source = f"{source} Q{number}"
+    options = _require(data, 'options', source)
+    if sorted(options) != list(OPTIONS):
+        raise QuestionBankError(f"{source}: options must be exactly {', '.join(OPTIONS)}")
+    correct = _require(data, 'correct', source)
+    if correct not in options:
+        raise QuestionBankError(f"{source}: correct answer '{correct}' is not an option")
+    return Question(
+        number=number,
+        question=str(_require(data, 'question', source)),
+        options=MappingProxyType({k: str(options[k]) for k in OPTIONS}),
+        correct=correct,
+        topic=str(_require(data, 'topic', source)),
+        difficulty=str(data.get('difficulty', 'Medium'))
+    )
+
+
+def build_assessment(data, source="<assessment>"):
+    assessment_id = str(_require(data, 'id', source))
+    questions = tuple(sorted(
+        (_build_question(q, source) for q in _require(data, 'questions', source)),
+        key=lambda q: q.number
+    ))
+    if not questions:
+        raise QuestionBankError(f"{source}: assessment has no questions")
+    numbers = [q.number for q in questions]
+    if len(set(numbers)) != len(numbers):
+        raise QuestionBankError(f"{source}: duplicate question numbers")
+
+    topic_index = {}
+    for q in questions:
+        topic_index.setdefault(q.topic, []).append(q.number)
+
+    paper_spec = adaptive = None
+    try:
+        paper_data = data.get('paper')
+        if data.get('adaptive'):
+            adaptive = build_adaptive_spec(data['adaptive'], questions)
+            # Until the items are calibrated, candidates get a stratified paper of max_items.
+            paper_data = dict(paper_data or {})
+            if int(paper_data.setdefault('size', adaptive.max_items)) != adaptive.max_items:
+                raise ValueError("paper size must equal adaptive max_items")
+        if paper_data:
+            paper_spec = build_paper_spec(paper_data, questions)
+    except ValueError as e:
+        raise QuestionBankError(f"{source}: {e}")
+    paper_size = paper_spec.size if paper_spec else len(questions)
+    key = AnswerKey(questions, paper_size, adaptive=adaptive is not None)
+    by_number = MappingProxyType({q.number: q for q in questions})
+
+    return Assessment(
+        assessment_id=assessment_id,
+        title=str(data.get('title', assessment_id)),
+        description=str(data.get('description', '')),
+        pass_score=_integer(data.get('pass_score', math.ceil(paper_size * 2 / 3)), 'pass_score', source),
+        time_limit_minutes=_integer(data.get('time_limit_minutes', 30), 'time_limit_minutes', source),
+        topics_covered=tuple(data.get('topics_covered', sorted(topic_index))),
+        questions=questions,
+        by_number=by_number,
+        topic_index=MappingProxyType({t: tuple(nums) for t, nums in topic_index.items()}),
+        key=key,
+        paper_spec=paper_spec,
+        fixed_paper=make_paper(assessment_id, key, by_number, numbers, [OPTIONS] * len(numbers)),
+        adaptive=adaptive
+    )
+
+
+def _read_file(path):
+    if path.endswith(".json"):
+        parse, errors = json.load, (OSError, ValueError)
+    else:
+        try:
+            import yaml
+        except ImportError:
+            raise QuestionBankError(f"{path}: PyYAML is required to load YAML question banks")
+        parse, errors = yaml.safe_load, (OSError, ValueError, yaml.YAMLError)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = parse(f)
+    except errors as e:
+        raise QuestionBankError(f"{path}: could not be read: {e}")
+    if not isinstance(data, dict):
+        raise QuestionBankError(f"{path}: expected a mapping of assessment fields")
+    return data
+
+
+def bank_signature(directory=QUESTION_BANK_DIR):
+    """Cheap change detector: names, sizes and mtimes of the bank files."""
+    try:
+        entries = sorted(os.scandir(directory), key=lambda e: e.name)
+    except FileNotFoundError:
+        return ()
+    return tuple(
+        (e.name, e.stat().st_mtime_ns, e.stat().st_size)
+        for e in entries
+        if e.is_file() and e.name.endswith(BANK_EXTENSIONS)
+    )
+
+
+def load_question_bank(directory=QUESTION_BANK_DIR):
+    signature = bank_signature(directory)
+    assessments = {}
+    for name, _, _ in signature:
+        path = os.path.join(directory, name)
+        try:
+            assessment = build_assessment(_read_file(path), path)
+        except (TypeError, AttributeError, KeyError) as e:
+            # A field of the wrong shape, e.g. a list where options are expected.
+            raise QuestionBankError(f"{path}: malformed assessment: {e!r}")
+        if assessment.assessment_id in assessments:
+            raise QuestionBankError(f"{path}: duplicate assessment id '{assessment.assessment_id}'")
+        assessments[assessment.assessment_id] = assessment
+    if not assessments:
+        raise QuestionBankError(f"No assessments found in '{directory}'")
+
+    default_id = os.environ.get("ASSESSMENT_ID")
+    if default_id not in assessments:
+        default_id = next(iter(assessments))
+    return QuestionBank(
+        assessments=MappingProxyType(assessments),
+        default_id=default_id,
+        signature=signature
+    )
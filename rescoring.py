@@ -0,0 +1,166 @@
+"""Re-score stored submissions after an answer key changes.
+
+Every answer key the app loads is recorded in the response store under a
+short version hash. Re-scoring streams an assessment's submissions through
+a process pool, scores each one against the current key and the previous
+recorded key, writes the new scores as a snapshot for the current version
+and reports every candidate whose status flipped. Run from the repository
+root:
+
+    python rescoring.py day1 --report changes.csv
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+from parallel import map_chunks
+from scoring import OPTIONS, encode_responses
+
+RESCORE_CHUNK_SIZE = 5000
+_CODES = {letter: code for code, letter in enumerate(OPTIONS, start=1)}
+# Matches no stored answer code, for questions missing from an older key.
+_NO_KEY = 255
+
+
+def answer_key_record(assessment):
+    """``(version, record)`` for the assessment's current key and pass mark."""
+    record = {
+        'correct': {str(q.number): q.correct for q in assessment.questions},
+        'paper_size': assessment.paper_size,
+        'pass_score': assessment.pass_score
+    }
+    digest = hashlib.sha256(json.dumps(record, sort_keys=True).encode('utf-8')).hexdigest()
+    return digest[:12], record
+
+
+def _key_codes(record, key):
+    return np.array([_CODES.get(record['correct'].get(str(q_num)), _NO_KEY) for q_num in key.question_ids],
+                    dtype=np.uint8)
+
+
+def _status(passed):
+    return "PASSED" if passed else "FAILED"
+
+
+def _rescore_chunk(task):
+    key, current, previous, rows = task
+    matrix = encode_responses([json.loads(row[5]) for row in rows], key)
+    correct, pass_score = current
+    scores = (matrix == correct).sum(axis=1)
+    passed = scores >= pass_score
+    snapshot = list(zip((row[0] for row in rows), scores.tolist(), passed.tolist()))
+    if previous is None:
+        return snapshot, 0, []
+    old_correct, old_pass_score = previous
+    old_scores = (matrix == old_correct).sum(axis=1)
+    old_passed = old_scores >= old_pass_score
+    changes = [
+        {
+            'Submission': row[0],
+            'Name': row[1] or 'N/A',
+            'Email': row[2] or 'N/A',
+            'Cohort': row[3],
+            'Attempt': row[4],
+            'Old Score': int(old_scores[i]),
+            'New Score': int(scores[i]),
+            'Old Status': _status(old_passed[i]),
+            'New Status': _status(passed[i])
+        }
+        for i, row in enumerate(rows)
+        if old_passed[i] != passed[i]
+    ]
+    return snapshot, int((old_scores != scores).sum()), changes
+
+
+def rescore_assessment(store, assessment, workers=None, chunk_size=RESCORE_CHUNK_SIZE, against=None):
+    """Re-score and publish every stored submission of ``assessment``.
+
+    Scores are compared with the key version ``against``, by default the
+    most recent other key recorded for the assessment. Returns a summary
+    dict with the list of PASSED/FAILED changes under ``'changes'``.
+    """
+    key = assessment.key
+    version, record = answer_key_record(assessment)
+    store.record_answer_key(assessment.assessment_id, version, record)
+    if against is None:
+        against = next(
+            (entry for entry in store.answer_keys(assessment.assessment_id) if entry['version'] != version), None
+        )
+    else:
+        against = next(
+            (entry for entry in store.answer_keys(assessment.assessment_id) if entry['version'] == against), None
+        )
+        if against is None:
+            raise ValueError("unknown answer key version to compare against")
+
+    current = (_key_codes(record, key), record['pass_score'])
+    previous = (_key_codes(against['answer_key'], key), against['answer_key']['pass_score']) if against else None
+    tasks = (
+        (key, current, previous, rows)
+        for rows in store.iter_raw_batches(chunk_size, assessment_id=assessment.assessment_id)
+    )
+
+    submissions = scores_changed = 0
+    changes = []
+    for snapshot, changed, flipped in map_chunks(_rescore_chunk, tasks, workers or os.cpu_count() or 1):
+        store.save_scores(version, snapshot)
+        submissions += len(snapshot)
+        scores_changed += changed
+        changes.extend(flipped)
+    store.publish_scores(assessment.assessment_id, version)
+    return {
+        'assessment_id': assessment.assessment_id,
+        'version': version,
+        'against': against['version'] if against else None,
+        'submissions': submissions,
+        'scores_changed': scores_changed,
+        'now_passed': sum(1 for change in changes if change['New Status'] == "PASSED"),
+        'now_failed': sum(1 for change in changes if change['New Status'] == "FAILED"),
+        'changes': changes
+    }
+
+
+def write_changes_csv(changes, out):
+    fields = ['Submission', 'Name', 'Email', 'Cohort', 'Attempt', 'Old Score', 'New Score', 'Old Status', 'New Status']
+    writer = csv.DictWriter(out, fieldnames=fields)
+    writer.writeheader()
+    writer.writerows(changes)
+
+
+def main():
+    from question_bank import QUESTION_BANK_DIR, load_question_bank
+    from response_store import open_store
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("assessment", nargs="?", help="assessment id (default: the bank's default assessment)")
+    parser.add_argument("--workers", type=int, default=None, help="scoring processes (default: CPU count)")
+    parser.add_argument("--against", help="answer key version to compare with (default: the previous one)")
+    parser.add_argument("--report", help="write PASSED/FAILED changes to this CSV file ('-' for stdout)")
+    args = parser.parse_args()
+
+    bank = load_question_bank(QUESTION_BANK_DIR)
+    if args.assessment and args.assessment not in bank.assessments:
+        parser.error(f"unknown assessment {args.assessment!r}; choose from {', '.join(bank.assessments)}")
+    assessment = bank.get(args.assessment)
+    summary = rescore_assessment(open_store(), assessment, args.workers, against=args.against)
+    print(
+        f"{summary['assessment_id']}: re-scored {summary['submissions']} submissions with key "
+        f"{summary['version']} (compared with {summary['against'] or 'no earlier key'}); "
+        f"{summary['scores_changed']} scores changed, {summary['now_passed']} now pass, "
+        f"{summary['now_failed']} now fail",
+        file=sys.stderr
+    )
+    if args.report == "-":
+        write_changes_csv(summary['changes'], sys.stdout)
+    elif args.report:
+        with open(args.report, "w", newline="", encoding="utf-8") as out:
+            write_changes_csv(summary['changes'], out)
+
+
+if __name__ == "__main__":
+    main()
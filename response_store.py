@@ -0,0 +1,713 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+
+from compaction import drop_resaves, read_legacy, read_segments
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join("responses", "responses.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    name TEXT,
+    email TEXT NOT NULL,
+    phone TEXT,
+    batch TEXT NOT NULL,
+    responses TEXT NOT NULL,
+    submission_id TEXT,
+    assessment_id TEXT NOT NULL DEFAULT 'day1',
+    cohort TEXT NOT NULL DEFAULT '',
+    attempt_number INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_submissions_email ON submissions(email);
+CREATE INDEX IF NOT EXISTS idx_submissions_timestamp ON submissions(timestamp);
+CREATE INDEX IF NOT EXISTS idx_submissions_batch ON submissions(batch);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    attempt_id TEXT PRIMARY KEY,
+    email TEXT NOT NULL,
+    assessment_id TEXT NOT NULL,
+    name TEXT,
+    phone TEXT,
+    answers BLOB NOT NULL,
+    status TEXT NOT NULL DEFAULT 'in_progress',
+    started_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    deadline TEXT,
+    cohort TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_attempts_email ON attempts(email, assessment_id, status);
+CREATE INDEX IF NOT EXISTS idx_attempts_assessment ON attempts(assessment_id, status);
+CREATE TABLE IF NOT EXISTS answer_keys (
+    assessment_id TEXT NOT NULL,
+    version TEXT NOT NULL,
+    answer_key TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    published_at TEXT,
+    PRIMARY KEY (assessment_id, version)
+);
+CREATE TABLE IF NOT EXISTS score_snapshots (
+    key_version TEXT NOT NULL,
+    submission_id INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    PRIMARY KEY (key_version, submission_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS item_parameters (
+    assessment_id TEXT NOT NULL,
+    key_hash TEXT NOT NULL,
+    parameters TEXT NOT NULL,
+    fitted_at TEXT NOT NULL,
+    PRIMARY KEY (assessment_id, key_hash)
+);
+CREATE TABLE IF NOT EXISTS roster (
+    assessment_id TEXT NOT NULL,
+    email_key TEXT NOT NULL,
+    email TEXT NOT NULL,
+    name TEXT,
+    phone TEXT NOT NULL,
+    cohort TEXT NOT NULL DEFAULT '',
+    max_attempts INTEGER NOT NULL DEFAULT 0,
+    imported_at TEXT NOT NULL,
+    PRIMARY KEY (assessment_id, email_key)
+) WITHOUT ROWID;
+"""
+
+MIGRATIONS = [
+    ("submission_id", "ALTER TABLE submissions ADD COLUMN submission_id TEXT"),
+    ("assessment_id", "ALTER TABLE submissions ADD COLUMN assessment_id TEXT NOT NULL DEFAULT 'day1'"),
+    ("cohort", "ALTER TABLE submissions ADD COLUMN cohort TEXT NOT NULL DEFAULT ''"),
+    ("attempt_number", """
+        ALTER TABLE submissions ADD COLUMN attempt_number INTEGER NOT NULL DEFAULT 1;
+        CREATE INDEX IF NOT EXISTS idx_submissions_candidate ON submissions(email, assessment_id);
+        UPDATE submissions SET attempt_number = (
+            SELECT COUNT(*) FROM submissions AS earlier
+            WHERE earlier.email = submissions.email
+              AND earlier.assessment_id = submissions.assessment_id
+              AND earlier.id <= submissions.id
+        )
+    """),
+]
+
+ATTEMPT_MIGRATIONS = [
+    ("deadline", "ALTER TABLE attempts ADD COLUMN deadline TEXT"),
+    ("cohort", "ALTER TABLE attempts ADD COLUMN cohort TEXT NOT NULL DEFAULT ''"),
+]
+
+POST_MIGRATION_SCHEMA = """
+CREATE UNIQUE INDEX IF NOT EXISTS idx_submissions_submission_id ON submissions(submission_id);
+CREATE INDEX IF NOT EXISTS idx_submissions_assessment ON submissions(assessment_id, id);
+CREATE INDEX IF NOT EXISTS idx_submissions_cohort ON submissions(assessment_id, cohort, id);
+CREATE INDEX IF NOT EXISTS idx_submissions_period ON submissions(assessment_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_submissions_attempt ON submissions(assessment_id, attempt_number, id);
+CREATE INDEX IF NOT EXISTS idx_submissions_candidate ON submissions(email, assessment_id);
+CREATE INDEX IF NOT EXISTS idx_attempts_deadline ON attempts(status, deadline);
+"""
+
+COLUMNS = "id, timestamp, name, email, phone, batch, responses, assessment_id, cohort, attempt_number"
+ATTEMPT_COLUMNS = "attempt_id, email, assessment_id, name, phone, answers, status, started_at, updated_at, deadline, cohort"
+
+# The attempt number is counted in the same statement so concurrent workers can't race it.
+INSERT_SUBMISSION = (
+    "INSERT OR IGNORE INTO submissions "
+    "(timestamp, name, email, phone, batch, responses, submission_id, assessment_id, cohort, attempt_number) "
+    "SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, COUNT(*) + 1 FROM submissions WHERE email = ? AND assessment_id = ?"
+)
+# The same, inserting nothing once the candidate already has the allowed number of submissions.
+INSERT_LIMITED_SUBMISSION = (
+    "INSERT OR IGNORE INTO submissions "
+    "(timestamp, name, email, phone, batch, responses, submission_id, assessment_id, cohort, attempt_number) "
+    "SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, used + 1 FROM "
+    "(SELECT COUNT(*) AS used FROM submissions WHERE email = ? AND assessment_id = ?) WHERE used < ?"
+)
+
+# Submissions stored before assessments had ids all belong to the Day 1 paper.
+LEGACY_ASSESSMENT_ID = "day1"
+
+
+def default_batch(timestamp):
+    return os.environ.get("ASSESSMENT_BATCH") or timestamp[:8]
+
+
+def submission_key(email, attempt_id):
+    return hashlib.sha256(f"{email.strip().lower()}|{attempt_id}".encode('utf-8')).hexdigest()
+
+
+def row_to_dict(row):
+    return {
+        'id': row[0],
+        'timestamp': row[1],
+        'name': row[2],
+        'email': row[3],
+        'phone': row[4],
+        'batch': row[5],
+        'responses': json.loads(row[6]),
+        'assessment_id': row[7],
+        'cohort': row[8],
+        'attempt_number': row[9]
+    }
+
+
+def attempt_to_dict(row):
+    return {
+        'attempt_id': row[0],
+        'email': row[1],
+        'assessment_id': row[2],
+        'name': row[3],
+        'phone': row[4],
+        'answers': bytes(row[5]),
+        'status': row[6],
+        'started_at': row[7],
+        'updated_at': row[8],
+        'deadline': row[9],
+        'cohort': row[10]
+    }
+
+
+def _statements(script):
+    return [statement.strip() for statement in script.split(";") if statement.strip()]
+
+
+def _submission_filter(assessment_id=None, cohort=None, batch=None, since=None, until=None, attempt_number=None):
+    """SQL conditions for the optional submission filters.
+
+    ``since`` is inclusive and ``until`` exclusive; both are timestamps in
+    the stored ``YYYYMMDD_HHMMSS`` form, so a date prefix such as
+    ``"20240105"`` also works. Every combination with an assessment id is
+    served by one of the (assessment_id, ...) indexes.
+    """
+    conditions = []
+    params = []
+    for column, op, value in (
+        ("assessment_id", "=", assessment_id),
+        ("cohort", "=", cohort),
+        ("batch", "=", batch),
+        ("timestamp", ">=", since),
+        ("timestamp", "<", until),
+        ("attempt_number", "=", attempt_number),
+    ):
+        if value is not None:
+            conditions.append(f" AND {column} {op} ?")
+            params.append(value)
+    return "".join(conditions), tuple(params)
+
+
+class AttemptLimitError(ValueError):
+    pass
+
+
+class ResponseStore:
+    """Append-only SQLite store for submitted assessments.
+
+    Rows are only ever inserted, so the autoincrement id doubles as a read
+    cursor: callers remember the last id they saw and ask for newer rows.
+
+    The database runs in WAL mode with a busy timeout, so several app
+    processes can share one file (on local or shared disk): readers never
+    block, and writers queue for the write lock instead of failing.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, timeout=30.0):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            # Serialise schema setup so workers starting together don't race the migrations.
+            self._conn.execute("BEGIN IMMEDIATE")
+            for statement in _statements(SCHEMA):
+                self._conn.execute(statement)
+            self._migrate()
+            for statement in _statements(POST_MIGRATION_SCHEMA):
+                self._conn.execute(statement)
+        self.writes = 0
+        self.duplicates_suppressed = 0
+        self._listeners = []
+
+    def _migrate(self):
+        for table, migrations in (("submissions", MIGRATIONS), ("attempts", ATTEMPT_MIGRATIONS)):
+            existing = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            for column, script in migrations:
+                if column not in existing:
+                    for statement in _statements(script):
+                        self._conn.execute(statement)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @classmethod
+    def from_url(cls, location):
+        # sqlite:///relative/path.db and sqlite:////absolute/path.db
+        return cls(location[1:] if location.startswith("/") else location)
+
+    def save(self, email, responses, name, phone, timestamp=None, batch=None, submission_id=None,
+             assessment_id=LEGACY_ASSESSMENT_ID, attempt_id=None, cohort="", max_attempts=0):
+        """Persist one submission and return its row id.
+
+        The submission's ``attempt_number`` is one more than the number of
+        earlier submissions by the same email for the same assessment. With
+        ``max_attempts``, a submission beyond that number is refused with
+        ``AttemptLimitError`` in the same statement, so attempts opened in
+        parallel cannot all be submitted; the attempt is closed as 'over_limit'.
+
+        When ``submission_id`` is given the write is idempotent: a repeat with
+        the same id returns the original row id and is counted in
+        ``duplicates_suppressed`` instead of being stored again. The matching
+        in-progress attempt, if any, is closed in the same transaction.
+        """
+        if submission_id is not None:
+            existing = self.find_submission(submission_id)
+            if existing is not None:
+                with self._lock:
+                    self.duplicates_suppressed += 1
+                return existing
+
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+        batch = batch or default_batch(timestamp)
+        with self._lock, self._conn:
+            params = (timestamp, name, email, phone, batch,
+                      json.dumps(responses, ensure_ascii=False), submission_id, assessment_id, cohort or "",
+                      email, assessment_id)
+            if max_attempts:
+                cur = self._conn.execute(INSERT_LIMITED_SUBMISSION, params + (max_attempts,))
+            else:
+                cur = self._conn.execute(INSERT_SUBMISSION, params)
+            if not cur.rowcount:
+                row = self._conn.execute(
+                    "SELECT id FROM submissions WHERE submission_id = ?", (submission_id,)
+                ).fetchone()
+                if row is not None:
+                    self.duplicates_suppressed += 1
+                    return row[0]
+                if attempt_id is not None:
+                    self._conn.execute(
+                        "UPDATE attempts SET status = 'over_limit', updated_at = ? WHERE attempt_id = ?",
+                        (datetime.now().isoformat(), attempt_id)
+                    )
+                row_id = None
+            else:
+                self.writes += 1
+                if attempt_id is not None:
+                    self._conn.execute(
+                        "UPDATE attempts SET status = 'submitted', updated_at = ? WHERE attempt_id = ?",
+                        (datetime.now().isoformat(), attempt_id)
+                    )
+                row_id = cur.lastrowid
+        if row_id is None:
+            raise AttemptLimitError(f"{email} has already submitted {assessment_id} the {max_attempts} time(s) allowed")
+        self._notify({
+            'id': row_id, 'timestamp': timestamp, 'name': name, 'email': email,
+            'assessment_id': assessment_id, 'attempt_id': attempt_id, 'cohort': cohort or ""
+        })
+        return row_id
+
+    def add_listener(self, callback):
+        """Call ``callback(submission)`` after each new submission this store writes.
+
+        Duplicates are not reported. Listeners run on the saving thread after
+        the transaction commits and must not raise.
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, submission):
+        for callback in self._listeners:
+            try:
+                callback(submission)
+            except Exception:
+                logger.exception("Submission listener failed")
+
+    def find_submission(self, submission_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM submissions WHERE submission_id = ?", (submission_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def start_attempt(self, attempt_id, email, assessment_id, name, phone, answers, deadline=None, cohort=""):
+        """Record a new attempt with its start time and optional ISO ``deadline``."""
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR IGNORE INTO attempts ({ATTEMPT_COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, 'in_progress', ?, ?, ?, ?)",
+                (attempt_id, email, assessment_id, name, phone, bytes(answers), now, now, deadline, cohort or "")
+            )
+
+    def save_attempt(self, attempt_id, email, assessment_id, name, phone, answers):
+        self.save_attempts([(attempt_id, email, assessment_id, name, phone, answers)])
+
+    def save_attempts(self, records):
+        """Upsert in-progress answers for many attempts in one transaction.
+
+        ``records`` are ``(attempt_id, email, assessment_id, name, phone, answers)``
+        tuples. Attempts that are already submitted are left alone.
+        """
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO attempts ({ATTEMPT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, 'in_progress', ?, ?, NULL, '') "
+                "ON CONFLICT(attempt_id) DO UPDATE SET answers = excluded.answers, "
+                "updated_at = excluded.updated_at WHERE attempts.status = 'in_progress'",
+                [
+                    (attempt_id, email, assessment_id, name, phone, bytes(answers), now, now)
+                    for attempt_id, email, assessment_id, name, phone, answers in records
+                ]
+            )
+
+    def set_attempt_status(self, attempt_id, status):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE attempts SET status = ?, updated_at = ? WHERE attempt_id = ? AND status = 'in_progress'",
+                (status, datetime.now().isoformat(), attempt_id)
+            )
+
+    def load_attempt(self, attempt_id):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {ATTEMPT_COLUMNS} FROM attempts WHERE attempt_id = ?", (attempt_id,)
+            ).fetchone()
+        return attempt_to_dict(row) if row else None
+
+    def find_open_attempt(self, email, assessment_id):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {ATTEMPT_COLUMNS} FROM attempts "
+                "WHERE email = ? AND assessment_id = ? AND status = 'in_progress' "
+                "ORDER BY updated_at DESC LIMIT 1",
+                (email, assessment_id)
+            ).fetchone()
+        return attempt_to_dict(row) if row else None
+
+    def expired_attempts(self, cutoff, limit=500):
+        """In-progress attempts whose deadline is earlier than the ISO time ``cutoff``."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {ATTEMPT_COLUMNS} FROM attempts "
+                "WHERE status = 'in_progress' AND deadline < ? ORDER BY deadline LIMIT ?",
+                (cutoff, limit)
+            ).fetchall()
+        return [attempt_to_dict(row) for row in rows]
+
+    def prune_attempts(self, cutoff):
+        """Delete submitted attempts last updated before ``cutoff``; their answers live in the submission."""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM attempts WHERE status = 'submitted' AND updated_at < ?", (cutoff,)
+            ).rowcount
+
+    def checkpoint(self):
+        """Fold the write-ahead log into the database and truncate it; False if readers kept it busy."""
+        with self._lock:
+            busy, _, _ = self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        return not busy
+
+    def attempt_counts(self, assessment_id):
+        """Number of attempts in each status for one assessment, across all workers."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM attempts WHERE assessment_id = ? GROUP BY status",
+                (assessment_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def stats(self):
+        with self._lock:
+            return {'writes': self.writes, 'duplicates_suppressed': self.duplicates_suppressed}
+
+    def load_since(self, cursor=0, assessment_id=None, max_id=None, **filters):
+        """Return ``(rows, cursor)`` for submissions newer than ``cursor``.
+
+        ``filters`` are the optional keyword filters of ``_submission_filter``.
+        """
+        clause, params = _submission_filter(assessment_id, **filters)
+        # Leave the id bounds out of a first load so a date range can use its index.
+        if cursor:
+            clause, params = " AND id > ?" + clause, (cursor,) + params
+        if max_id is not None:
+            clause, params = " AND id <= ?" + clause, (max_id,) + params
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {COLUMNS} FROM submissions WHERE 1 = 1{clause} ORDER BY id", params
+            ).fetchall()
+        if not rows:
+            return [], cursor
+        return [row_to_dict(row) for row in rows], rows[-1][0]
+
+    def iter_batches(self, batch_size=5000, max_id=None, assessment_id=None, **filters):
+        """Yield submissions oldest-first in pages of ``batch_size`` rows.
+
+        The upper bound is fixed when iteration starts so a long export sees
+        a consistent snapshot while new submissions keep arriving.
+        """
+        clause, params = _submission_filter(assessment_id, **filters)
+        cursor = 0
+        max_id = self.latest_cursor(assessment_id) if max_id is None else max_id
+        while cursor < max_id:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT {COLUMNS} FROM submissions WHERE id > ? AND id <= ?{clause} ORDER BY id LIMIT ?",
+                    (cursor, max_id) + params + (batch_size,)
+                ).fetchall()
+            if not rows:
+                break
+            yield [row_to_dict(row) for row in rows]
+            cursor = rows[-1][0]
+
+    def iter_raw_batches(self, batch_size=5000, max_id=None, assessment_id=None):
+        """Like ``iter_batches`` but yields ``(id, name, email, cohort, attempt_number, responses_json)``
+        tuples, leaving the JSON for the caller to parse (e.g. in worker processes).
+        """
+        clause, params = _submission_filter(assessment_id)
+        cursor = 0
+        max_id = self.latest_cursor(assessment_id) if max_id is None else max_id
+        while cursor < max_id:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, name, email, cohort, attempt_number, responses FROM submissions "
+                    f"WHERE id > ? AND id <= ?{clause} ORDER BY id LIMIT ?",
+                    (cursor, max_id) + params + (batch_size,)
+                ).fetchall()
+            if not rows:
+                break
+            yield rows
+            cursor = rows[-1][0]
+
+    def load_all(self):
+        return self.load_since(0)[0]
+
+    def find_by_email(self, email):
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {COLUMNS} FROM submissions WHERE email = ? ORDER BY id",
+                (email,)
+            ).fetchall()
+        return [row_to_dict(row) for row in rows]
+
+    def latest_cursor(self, assessment_id=None):
+        clause, params = _submission_filter(assessment_id)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT MAX(id) FROM submissions WHERE 1 = 1{clause}", params
+            ).fetchone()
+        return row[0] or 0
+
+    def filter_options(self, assessment_id):
+        """Cohorts, highest attempt number and timestamp range stored for an assessment."""
+        with self._lock:
+            cohorts = [row[0] for row in self._conn.execute(
+                "SELECT DISTINCT cohort FROM submissions WHERE assessment_id = ? ORDER BY cohort",
+                (assessment_id,)
+            )]
+            max_attempt, = self._conn.execute(
+                "SELECT MAX(attempt_number) FROM submissions WHERE assessment_id = ?", (assessment_id,)
+            ).fetchone()
+            first, = self._conn.execute(
+                "SELECT MIN(timestamp) FROM submissions WHERE assessment_id = ?", (assessment_id,)
+            ).fetchone()
+            last, = self._conn.execute(
+                "SELECT MAX(timestamp) FROM submissions WHERE assessment_id = ?", (assessment_id,)
+            ).fetchone()
+        return {'cohorts': cohorts, 'max_attempt': max_attempt or 0, 'first': first, 'last': last}
+
+    def record_answer_key(self, assessment_id, version, answer_key):
+        """Remember an answer key by version; keys seen before keep their first record time."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO answer_keys (assessment_id, version, answer_key, recorded_at) "
+                "VALUES (?, ?, ?, ?)",
+                (assessment_id, version, json.dumps(answer_key), datetime.now().isoformat())
+            )
+
+    def answer_keys(self, assessment_id):
+        """Recorded answer keys for an assessment, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT version, answer_key, recorded_at, published_at FROM answer_keys "
+                "WHERE assessment_id = ? ORDER BY recorded_at DESC, rowid DESC",
+                (assessment_id,)
+            ).fetchall()
+        return [
+            {'version': row[0], 'answer_key': json.loads(row[1]), 'recorded_at': row[2], 'published_at': row[3]}
+            for row in rows
+        ]
+
+    def save_scores(self, key_version, rows):
+        """Store ``(submission_id, score, passed)`` rows in the snapshot for ``key_version``."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO score_snapshots (key_version, submission_id, score, passed) "
+                "VALUES (?, ?, ?, ?)",
+                [(key_version, int(submission_id), int(score), int(passed)) for submission_id, score, passed in rows]
+            )
+
+    def publish_scores(self, assessment_id, key_version):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE answer_keys SET published_at = ? WHERE assessment_id = ? AND version = ?",
+                (datetime.now().isoformat(), assessment_id, key_version)
+            )
+
+    def save_item_parameters(self, assessment_id, key_hash, parameters):
+        """Store an IRT calibration, replacing any earlier one for the same answer key."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO item_parameters (assessment_id, key_hash, parameters, fitted_at) "
+                "VALUES (?, ?, ?, ?)",
+                (assessment_id, key_hash, json.dumps(parameters), datetime.now().isoformat())
+            )
+
+    def item_parameters(self, assessment_id, key_hash):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT parameters FROM item_parameters WHERE assessment_id = ? AND key_hash = ?",
+                (assessment_id, key_hash)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_roster(self, assessment_id, entries, replace=False):
+        """Store ``(email_key, email, name, phone, cohort, max_attempts)`` rows in an assessment's roster.
+
+        Rows replace earlier entries for the same email; ``replace`` clears the
+        roster first. Each import bumps the roster version so workers reload
+        their in-memory index. Returns the number of rows stored.
+        """
+        imported_at = datetime.now().isoformat()
+        records = [(assessment_id, *entry, imported_at) for entry in entries]
+        with self._lock, self._conn:
+            if replace:
+                self._conn.execute("DELETE FROM roster WHERE assessment_id = ?", (assessment_id,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO roster "
+                "(assessment_id, email_key, email, name, phone, cohort, max_attempts, imported_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                records
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (f"roster_version:{assessment_id}", f"{imported_at}:{uuid.uuid4().hex[:8]}")
+            )
+        return len(records)
+
+    def load_roster(self, assessment_id):
+        """``(email_key, email, phone, cohort, max_attempts)`` for every candidate on the roster."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT email_key, email, phone, cohort, max_attempts FROM roster WHERE assessment_id = ?",
+                (assessment_id,)
+            ).fetchall()
+
+    def roster_size(self, assessment_id):
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM roster WHERE assessment_id = ?", (assessment_id,)).fetchone()
+        return row[0]
+
+    def roster_version(self, assessment_id):
+        """Changes on every roster import; None if the assessment has never had a roster."""
+        return self.get_meta(f"roster_version:{assessment_id}")
+
+    def count_submissions(self, email, assessment_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM submissions WHERE email = ? AND assessment_id = ?", (email, assessment_id)
+            ).fetchone()
+        return row[0]
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def import_json_files(self, directory="responses"):
+        """One-time import of legacy ``responses_*.json`` files and their compacted segments.
+
+        Returns the number of submissions imported; later calls are no-ops.
+        """
+        if self.get_meta("json_import_done") or not os.path.isdir(directory):
+            return 0
+
+        legacy = []
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                legacy.append(read_legacy(directory, filename))
+            except (OSError, ValueError) as e:
+                logger.warning("Skipping unreadable response file %s: %s", filename, e)
+        segments = list(read_segments(directory))
+        # Files not yet compacted may be re-saves of each other or of a segment row.
+        submissions = [
+            {name: row[name] for name in ('timestamp', 'name', 'email', 'phone', 'responses', 'submission_id')}
+            for row in drop_resaves(legacy, segments) + segments
+        ]
+
+        with self._lock, self._conn:
+            self._insert_many(submissions)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_import_done', ?)",
+                (datetime.now().isoformat(),)
+            )
+        return len(submissions)
+
+    def save_many(self, submissions):
+        """Bulk-insert submission dicts in one transaction.
+
+        Rows whose ``submission_id`` is already stored are skipped. Returns
+        the number of rows inserted.
+        """
+        with self._lock, self._conn:
+            return self._insert_many(submissions)
+
+    def _insert_many(self, submissions):
+        records = [
+            (
+                sub['timestamp'],
+                sub.get('name'),
+                sub['email'],
+                sub.get('phone'),
+                sub.get('batch') or default_batch(sub['timestamp']),
+                json.dumps(sub.get('responses', {}), ensure_ascii=False),
+                sub.get('submission_id'),
+                sub.get('assessment_id', LEGACY_ASSESSMENT_ID),
+                sub.get('cohort') or "",
+                sub['email'],
+                sub.get('assessment_id', LEGACY_ASSESSMENT_ID)
+            )
+            for sub in submissions
+        ]
+        before = self._conn.total_changes
+        self._conn.executemany(INSERT_SUBMISSION, records)
+        return self._conn.total_changes - before
+
+
+STORE_BACKENDS = {
+    'sqlite': ResponseStore,
+}
+
+
+def open_store(url=None):
+    """Open the response store named by ``url`` or ``RESPONSE_STORE_URL``.
+
+    Every app worker that should share submissions and in-progress attempts
+    must point at the same store, e.g. ``sqlite:////mnt/shared/responses.db``.
+    """
+    url = url or os.environ.get("RESPONSE_STORE_URL") or f"sqlite:///{DEFAULT_DB_PATH}"
+    scheme, _, location = url.partition("://")
+    if scheme not in STORE_BACKENDS:
+        raise ValueError(f"Unsupported response store '{scheme}' (expected one of: {', '.join(STORE_BACKENDS)})")
+    return STORE_BACKENDS[scheme].from_url(location)
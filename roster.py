@@ -0,0 +1,186 @@
+"""Candidate rosters: bulk pre-registration and login checks.
+
+An instructor imports a CSV or Excel list of candidates for an assessment
+(``name``, ``email`` and ``phone`` columns, optionally ``cohort`` and
+``max_attempts``). Rows are validated and deduplicated as whole columns, so a
+100,000-row list imports in seconds. Once an assessment has a roster, only
+listed candidates can start it. The phone number they enter must match the
+roster, and a candidate who has used their ``max_attempts`` is turned away.
+The roster is held in memory as a dict keyed by normalised email, so each
+login check is a single hash lookup. Run from the repository root:
+
+    python roster.py candidates.xlsx --assessment day1 --max-attempts 2
+"""
+import argparse
+import sys
+
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+PHONE_PATTERN = r'^[0-9]{10}$'
+MIN_NAME_LENGTH = 3
+ROSTER_COLUMNS = ('name', 'email', 'phone', 'cohort', 'max_attempts')
+# Header spellings accepted for each roster column.
+COLUMN_ALIASES = {
+    'name': ('name', 'full name', 'candidate', 'student name'),
+    'email': ('email', 'email id', 'email address', 'e-mail'),
+    'phone': ('phone', 'phone number', 'mobile', 'mobile number'),
+    'cohort': ('cohort', 'batch', 'group'),
+    'max_attempts': ('max_attempts', 'max attempts', 'attempts', 'attempts allowed')
+}
+
+
+class RosterError(ValueError):
+    pass
+
+
+def email_key(email):
+    return email.strip().lower()
+
+
+def read_roster(source, filename):
+    """Read a roster file into a DataFrame of strings; ``filename`` picks CSV or Excel."""
+    import pandas as pd
+
+    if filename.lower().endswith(".xlsx"):
+        frame = pd.read_excel(source, dtype=str)
+    elif filename.lower().endswith(".csv"):
+        frame = pd.read_csv(source, dtype=str, skipinitialspace=True)
+    else:
+        raise RosterError(f"{filename}: rosters must be .csv or .xlsx files")
+    headers = {str(column).strip().lower(): column for column in frame.columns}
+    renamed = {}
+    for column, aliases in COLUMN_ALIASES.items():
+        match = next((headers[alias] for alias in aliases if alias in headers), None)
+        if match is not None:
+            renamed[match] = column
+    missing = [column for column in ('name', 'email', 'phone') if column not in renamed.values()]
+    if missing:
+        raise RosterError(f"{filename}: missing column(s) {', '.join(missing)}")
+    return frame.rename(columns=renamed)[[c for c in ROSTER_COLUMNS if c in renamed.values()]]
+
+
+def validate_roster(frame, default_max_attempts=0):
+    """Split a roster into ``(accepted, rejected, duplicates)`` DataFrames.
+
+    Values are trimmed, phone numbers lose spaces, dashes and an Excel
+    ``.0``, and each row is checked with the same rules as the login form.
+    ``rejected`` gains a ``reason`` column. Among valid rows sharing an
+    email, the last one wins; the earlier ones are returned as ``duplicates``.
+    """
+    import pandas as pd
+
+    frame = frame.copy()
+    for column in ROSTER_COLUMNS:
+        if column not in frame:
+            frame[column] = ""
+    frame = frame.fillna("")
+    frame['name'] = frame['name'].astype(str).str.strip()
+    frame['email'] = frame['email'].astype(str).str.strip()
+    frame['phone'] = frame['phone'].astype(str).str.replace(r'[\s-]', '', regex=True).str.replace(
+        r'\.0$', '', regex=True)
+    frame['cohort'] = frame['cohort'].astype(str).str.strip()
+    attempts = frame['max_attempts'].astype(str).str.strip()
+    numeric = attempts.str.fullmatch(r'\d+(\.0)?')
+    frame['max_attempts'] = attempts.where(numeric, "0").astype(float).astype(int)
+    frame.loc[attempts == "", 'max_attempts'] = int(default_max_attempts)
+
+    reason = pd.Series("", index=frame.index)
+    checks = (
+        (frame['name'].str.len() < MIN_NAME_LENGTH, f"name shorter than {MIN_NAME_LENGTH} characters"),
+        (~frame['email'].str.fullmatch(EMAIL_PATTERN), "invalid email"),
+        (~frame['phone'].str.fullmatch(PHONE_PATTERN), "phone must be 10 digits"),
+        (~numeric & (attempts != ""), "max_attempts must be a whole number")
+    )
+    for failed, message in checks:
+        reason = reason.where(~failed | (reason != ""), message)
+    frame['email_key'] = frame['email'].str.lower()
+
+    valid = frame[reason == ""]
+    repeated = valid.duplicated('email_key', keep='last')
+    bad = reason != ""
+    rejected = frame[bad].drop(columns='email_key').assign(max_attempts=attempts[bad], reason=reason[bad])
+    return valid[~repeated], rejected, valid[repeated].drop(columns='email_key')
+
+
+def import_roster(store, assessment_id, frame, default_max_attempts=0, replace=False):
+    """Validate ``frame`` and store it as the roster of ``assessment_id``; returns a summary dict."""
+    accepted, rejected, duplicates = validate_roster(frame, default_max_attempts)
+    stored = store.save_roster(
+        assessment_id,
+        accepted[['email_key', 'email', 'name', 'phone', 'cohort', 'max_attempts']].itertuples(index=False),
+        replace=replace
+    )
+    return {
+        'assessment_id': assessment_id,
+        'rows': len(frame),
+        'imported': stored,
+        'duplicates': len(duplicates),
+        'rejected': rejected,
+        'roster_size': store.roster_size(assessment_id)
+    }
+
+
+class RosterIndex:
+    """Memory-resident roster of one assessment, keyed by normalised email."""
+
+    def __init__(self, entries):
+        cohorts = {}
+        # Many candidates share a cohort; keep one copy of each cohort string.
+        self._entries = {
+            key: (email, phone, int(max_attempts), cohorts.setdefault(cohort, cohort))
+            for key, email, phone, cohort, max_attempts in entries
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, email):
+        """``(email, phone, max_attempts, cohort)`` as registered, or None; ``email`` may differ in case."""
+        return self._entries.get(email_key(email))
+
+
+def check_candidate(index, email, phone, submissions_used):
+    """Why a candidate may not start, or None if they may.
+
+    ``submissions_used`` is called with the registered email only when the
+    candidate has an attempt limit.
+    """
+    entry = index.get(email)
+    if entry is None:
+        return "This email is not registered for this assessment. Please check it or contact your instructor."
+    registered_email, registered_phone, max_attempts, _ = entry
+    if phone.strip() != registered_phone:
+        return "The phone number does not match the one registered for this email."
+    if max_attempts and submissions_used(registered_email) >= max_attempts:
+        return f"You have already used all {max_attempts} attempt(s) allowed for this assessment."
+    return None
+
+
+def main():
+    from response_store import open_store
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", help="roster .csv or .xlsx file")
+    parser.add_argument("--assessment", required=True, help="assessment id the roster is for")
+    parser.add_argument("--max-attempts", type=int, default=0,
+                        help="attempts allowed when the file has no max_attempts value (0: unlimited)")
+    parser.add_argument("--replace", action="store_true", help="replace the existing roster instead of adding to it")
+    parser.add_argument("--rejected", help="write rejected rows with reasons to this CSV file")
+    args = parser.parse_args()
+
+    try:
+        frame = read_roster(args.file, args.file)
+    except RosterError as e:
+        parser.error(str(e))
+    summary = import_roster(open_store(), args.assessment, frame, args.max_attempts, args.replace)
+    print(
+        f"{args.assessment}: {summary['imported']} of {summary['rows']} rows imported, "
+        f"{summary['duplicates']} duplicate emails merged, {len(summary['rejected'])} rejected; "
+        f"roster now has {summary['roster_size']} candidates",
+        file=sys.stderr
+    )
+    if args.rejected:
+        summary['rejected'].to_csv(args.rejected, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import operator
+
+import numpy as np
+
+OPTIONS = ('a', 'b', 'c', 'd')
+UNANSWERED = 0
+
+# Byte -> answer code lookup. Letters map to 1..4, anything else to 0.
+_CODE_LUT = np.zeros(256, dtype=np.uint8)
+for _code, _letter in enumerate(OPTIONS, start=1):
+    _CODE_LUT[ord(_letter)] = _code
+    _CODE_LUT[ord(_letter.upper())] = _code
+
+
+class AnswerKey:
+    """Column layout and answer-key vector derived once per assessment."""
+
+    def __init__(self, questions, paper_size=None, adaptive=False):
+        questions = sorted(questions, key=lambda q: q.number)
+        # Percentages are out of the questions one candidate answers, not the whole pool.
+        self.paper_size = paper_size or len(questions)
+        # Candidates see different questions, so item statistics only count those who saw each one.
+        self.sampled = adaptive or self.paper_size < len(questions)
+        self.question_ids = [q.number for q in questions]
+        self.response_keys = [str(q_num) for q_num in self.question_ids]
+        self.column = {q_num: i for i, q_num in enumerate(self.question_ids)}
+        self.getter = operator.itemgetter(*self.response_keys)
+        self.correct = np.array([OPTIONS.index(q.correct) + 1 for q in questions], dtype=np.uint8)
+        self.topics = sorted({q.topic for q in questions})
+        topic_index = {topic: i for i, topic in enumerate(self.topics)}
+        self.topic_of = np.array([topic_index[q.topic] for q in questions], dtype=np.intp)
+        self.topic_matrix = np.zeros((len(self.question_ids), len(self.topics)), dtype=np.int64)
+        self.topic_matrix[np.arange(len(self.question_ids)), self.topic_of] = 1
+
+    @property
+    def num_questions(self):
+        return len(self.question_ids)
+
+
+def encode_responses(responses_list, key):
+    """Pack response dicts into an ``(students, questions)`` uint8 code matrix.
+
+    Each student's answers are joined into one fixed-width byte string so
+    the whole batch is decoded with a single table lookup.
+    """
+    n = len(responses_list)
+    if n == 0:
+        return np.zeros((0, key.num_questions), dtype=np.uint8)
+    packed = "".join(_pack_row(responses, key) for responses in responses_list).encode('ascii', 'replace')
+    raw = np.frombuffer(packed, dtype=np.uint8).reshape(n, key.num_questions)
+    return _CODE_LUT[raw]
+
+
+def _pack_row(responses, key):
+    try:
+        row = "".join(key.getter(responses))
+        if len(row) == key.num_questions:
+            return row
+    except (KeyError, TypeError):
+        pass
+    return "".join((responses.get(k) or "-")[:1] for k in key.response_keys)
+
+
+class ScoreResult:
+    def __init__(self, key, matrix):
+        self.key = key
+        self.num_students = matrix.shape[0]
+        answered = matrix != UNANSWERED
+        correct = matrix == key.correct
+        self.scores = correct.sum(axis=1)
+        self.percentages = self.scores * (100.0 / max(key.paper_size, 1))
+
+        self.question_correct = correct.sum(axis=0)
+        self.question_answered = answered.sum(axis=0)
+        self.p_values = self.question_correct / max(self.num_students, 1)
+
+        self.topic_correct = self.question_correct @ key.topic_matrix
+        self.topic_total = self.question_answered @ key.topic_matrix
+
+    def topic_accuracy(self):
+        return {
+            topic: float(self.topic_correct[i] * 100.0 / self.topic_total[i])
+            for i, topic in enumerate(self.key.topics)
+            if self.topic_total[i] > 0
+        }
+
+
+def score_matrix(matrix, key):
+    return ScoreResult(key, matrix)
+
+
+def score_responses(responses_list, key):
+    return score_matrix(encode_responses(responses_list, key), key)